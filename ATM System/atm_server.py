@@ -0,0 +1,268 @@
+"""Multi-session ATM server speaking a line protocol over asyncio.
+
+Each client connection is a session. Commands are one line each and every
+reply is one JSON object per line:
+
+    CREATE <pin> <amount> <name...>   -> {"ok": true, "account_number": ...}
+    LOGIN <account_number> <pin>
+    BALANCE
+    WITHDRAW <amount>
+    DEPOSIT <amount>
+    TRANSFER <account_number> <amount>
+    HISTORY [limit]
+    PIN <new_pin>
+    LOGOUT
+    STATS                             -> account cache counters
+    QUIT
+
+Amounts are decimal dollars ("12.50") and are handled as integer cents.
+SQLite work runs on a bounded thread pool, and operations that change a
+balance are serialized per account so two sessions can't double-spend.
+
+    python atm_server.py --port 8765 --workers 16
+"""
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from atm_system import (
+    DB_PATH, Account, AccountCache, AccountNumberAllocator, ConnectionManager, GroupCommitter,
+    format_cents, parse_cents,
+)
+
+log = logging.getLogger("atm_server")
+
+
+class ATMError(Exception):
+    """An operation was refused; the message is sent back to the client."""
+
+
+class ATMService:
+    """ATM operations without stdin, run on a bounded worker pool."""
+
+    def __init__(self, db=None, workers=16, group_commit=False, cache=None):
+        if db is not None:
+            Account.db = db
+            Account.cache.clear()  # Rows cached from another database are meaningless
+        if cache is not None:
+            Account.cache = cache
+        if group_commit and Account.committer is None:
+            Account.committer = GroupCommitter(Account.db)
+        Account.create_table()
+        self.allocator = AccountNumberAllocator(Account.db)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="atm-db")
+        self._locks = {}
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _serialized(self, account_numbers, fn, *args):
+        # Locks are reference counted so idle accounts don't pile up, and
+        # always taken in sorted order so transfers can't deadlock.
+        account_numbers = sorted(set(account_numbers))
+        entries = []
+        for acc in account_numbers:
+            entry = self._locks.setdefault(acc, [asyncio.Lock(), 0])
+            entry[1] += 1
+            entries.append(entry)
+        acquired = []
+        try:
+            for lock, _ in entries:
+                await lock.acquire()
+                acquired.append(lock)
+            return await self._run(fn, *args)
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+            for acc, entry in zip(account_numbers, entries):
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[acc]
+
+    async def create_account(self, name, pin, amount):
+        if not (pin.isdigit() and len(pin) == 4):
+            raise ATMError("PIN must be 4 digits.")
+        if amount <= 0:
+            raise ATMError("Amount must be positive.")
+
+        def create():
+            account = Account(self.allocator.allocate(), pin, name, amount)
+            account.open()
+            return account.account_number
+        return await self._run(create)
+
+    async def login(self, account_number, pin):
+        account = await self._run(Account.get, account_number)
+        if account is None or account.pin != pin:
+            raise ATMError("Invalid credentials.")
+        return account
+
+    async def balance(self, account_number):
+        account = await self._run(Account.get, account_number)
+        return account.balance_cents
+
+    async def withdraw(self, account_number, amount):
+        if amount <= 0:
+            raise ATMError("Amount must be positive.")
+        account = Account(account_number, None, None, None)
+        new_balance = await self._serialized(
+            [account_number], account.withdraw, amount)
+        if new_balance is None:
+            raise ATMError("Insufficient balance.")
+        return new_balance
+
+    async def deposit(self, account_number, amount):
+        if amount <= 0:
+            raise ATMError("Amount must be positive.")
+        account = Account(account_number, None, None, None)
+        return await self._serialized(
+            [account_number], account.deposit, amount)
+
+    async def transfer(self, account_number, recipient_account_number, amount):
+        if recipient_account_number == account_number:
+            raise ATMError("Cannot transfer to your own account.")
+        if amount <= 0:
+            raise ATMError("Amount must be positive.")
+        account = Account(account_number, None, None, None)
+        try:
+            new_balance = await self._serialized(
+                [account_number, recipient_account_number], account.transfer, recipient_account_number, amount)
+        except LookupError as e:
+            raise ATMError(str(e))
+        if new_balance is None:
+            raise ATMError("Insufficient funds.")
+        return new_balance
+
+    async def history(self, account_number, limit=20):
+        return await self._run(Account.get_transactions, account_number, None, None, limit)
+
+    async def change_pin(self, account_number, new_pin):
+        if not (new_pin.isdigit() and len(new_pin) == 4):
+            raise ATMError("PIN must be 4 digits.")
+        account = Account(account_number, None, None, None)
+        await self._serialized([account_number], account.change_pin, new_pin)
+
+    def cache_stats(self):
+        return Account.cache.stats()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if Account.committer is not None:
+            Account.committer.close()
+            Account.committer = None
+
+
+def _balance(cents):
+    return {"balance": format_cents(cents), "balance_cents": cents}
+
+
+class Session:
+    """Per-connection state: which account, if any, is logged in."""
+
+    def __init__(self, service):
+        self.service = service
+        self.account_number = None
+
+    def _require_login(self):
+        if self.account_number is None:
+            raise ATMError("Not logged in.")
+        return self.account_number
+
+    async def handle(self, line):
+        parts = line.split()
+        if not parts:
+            raise ATMError("Empty command.")
+        command, args = parts[0].upper(), parts[1:]
+        try:
+            if command == "CREATE" and len(args) >= 3:
+                number = await self.service.create_account(" ".join(args[2:]), args[0], parse_cents(args[1]))
+                return {"account_number": number}
+            if command == "LOGIN" and len(args) == 2:
+                account = await self.service.login(args[0], args[1])
+                self.account_number = account.account_number
+                return {"name": account.name}
+            if command == "BALANCE" and not args:
+                return _balance(await self.service.balance(self._require_login()))
+            if command == "WITHDRAW" and len(args) == 1:
+                return _balance(await self.service.withdraw(self._require_login(), parse_cents(args[0])))
+            if command == "DEPOSIT" and len(args) == 1:
+                return _balance(await self.service.deposit(self._require_login(), parse_cents(args[0])))
+            if command == "TRANSFER" and len(args) == 2:
+                return _balance(await self.service.transfer(self._require_login(), args[0], parse_cents(args[1])))
+            if command == "HISTORY" and len(args) <= 1:
+                limit = int(args[0]) if args else 20
+                rows = await self.service.history(self._require_login(), limit)
+                return {"transactions": [{"details": d, "timestamp": t} for d, t in rows]}
+            if command == "PIN" and len(args) == 1:
+                await self.service.change_pin(self._require_login(), args[0])
+                return {}
+            if command == "STATS" and not args:
+                return {"cache": self.service.cache_stats()}
+            if command == "LOGOUT" and not args:
+                self.account_number = None
+                return {}
+        except ValueError:
+            raise ATMError("Invalid input.")
+        raise ATMError(f"Unknown command or wrong arguments: {command}")
+
+
+async def handle_client(service, reader, writer):
+    session = Session(service)
+    try:
+        while line := await reader.readline():
+            try:
+                line = line.decode(errors="replace").strip()
+                if line.upper() == "QUIT":
+                    break
+                reply = {"ok": True, **await session.handle(line)}
+            except ATMError as e:
+                reply = {"ok": False, "error": str(e)}
+            except Exception:
+                # A bug or database failure fails this command, not the whole session
+                log.exception("Command failed: %r", line)
+                reply = {"ok": False, "error": "Internal error."}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, service):
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(service, r, w), host, port, backlog=4096)
+    print(f"ATM server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session ATM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database file")
+    parser.add_argument("--workers", type=int, default=16, help="Size of the SQLite thread pool")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="Batch concurrent ledger writes into shared commits; pays off with "
+                             "synchronous=FULL and many concurrent writers, not for a single session")
+    parser.add_argument("--account-cache-size", type=int, default=10000,
+                        help="Accounts kept in the lookup cache (0 disables it)")
+    parser.add_argument("--account-cache-ttl", type=float, default=30.0,
+                        help="Seconds a cached account stays valid")
+    args = parser.parse_args()
+
+    service = ATMService(ConnectionManager(args.db), workers=args.workers, group_commit=args.group_commit,
+                         cache=AccountCache(args.account_cache_size, args.account_cache_ttl))
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,83 +1,762 @@
+import argparse
+import csv
+import json
+import queue
+import re
 import sqlite3
-import random
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+DB_PATH = "atm.db"
+
+
+class ConnectionManager:
+    """Hands out one long-lived SQLite connection per thread."""
+
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path=DB_PATH, synchronous="NORMAL", cache_size=-16000,
+                 statement_cache_size=256, wal=True):
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {', '.join(self.SYNCHRONOUS_MODES)}")
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)  # Negative values are KiB, positive are pages
+        self.statement_cache_size = int(statement_cache_size)
+        self.wal = wal
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # sqlite3 keeps compiled statements in a per-connection LRU, so a
+        # long-lived connection only prepares each query once.
+        conn = sqlite3.connect(self.db_path, cached_statements=self.statement_cache_size,
+                               check_same_thread=False)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size={self.cache_size}")
+        return conn
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class GroupCommitter:
+    """Coalesces writes from many threads into one transaction and one fsync.
+
+    Worth it when commits are fsync-bound (synchronous=FULL) and many threads
+    write at once; with synchronous=NORMAL or few writers it is about even
+    with each thread committing on its own connection. Each batch takes what
+    is already queued; max_delay > 0 waits that long for more, which only
+    slows callers down unless writes arrive in tight bursts.
+    """
+
+    def __init__(self, db, max_batch=512, max_delay=0.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="atm-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, op):
+        """Queue op(conn) for the next batch and return a Future with its result."""
+        if self._closed:
+            raise RuntimeError("GroupCommitter is closed")
+        future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def run(self, op):
+        return self.submit(op).result()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Finish this batch, stop on the next loop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = self.db.connection()
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            results = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for op, future in batch:
+                    # A savepoint per op lets one failure roll back alone
+                    conn.execute("SAVEPOINT ledger_op")
+                    try:
+                        results.append((future, op(conn), None))
+                        conn.execute("RELEASE ledger_op")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO ledger_op")
+                        conn.execute("RELEASE ledger_op")
+                        results.append((future, None, e))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+def luhn_check_digit(digits):
+    total = 0
+    # Double every second digit counting from the right of the payload
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+class AccountNumberAllocator:
+    """Allocates unique 10-digit account numbers: a 9-digit sequence plus a Luhn check digit.
+
+    Each process reserves a block of sequence values with one atomic UPDATE
+    of the sequences table and then hands numbers out from memory, so
+    allocation is O(1) and never retries against the database. Numbers that
+    already exist in the block's range (e.g. legacy random ones) are skipped
+    when the block is reserved; numbers written later inside a block that was
+    already reserved can't be seen, so writers must check reserved() first.
+    """
+
+    SEQUENCE = "account_number"
+    MAX_SEQUENCE = 10 ** 9
+
+    def __init__(self, db, block_size=1000):
+        self.db = db
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._taken = set()
+
+    def _reserve_block(self):
+        conn = self.db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR IGNORE INTO sequences (name, next_value) VALUES (?, 1)", (self.SEQUENCE,))
+            start = conn.execute("SELECT next_value FROM sequences WHERE name = ?",
+                                 (self.SEQUENCE,)).fetchone()[0]
+            end = min(start + self.block_size, self.MAX_SEQUENCE)
+            if start >= end:
+                raise RuntimeError("Account number space exhausted")
+            conn.execute("UPDATE sequences SET next_value = ? WHERE name = ?", (end, self.SEQUENCE))
+            taken = {row[0] for row in conn.execute(
+                "SELECT account_number FROM accounts WHERE account_number BETWEEN ? AND ?",
+                (f"{start:09d}0", f"{end - 1:09d}9"))}
+        self._next, self._end, self._taken = start, end, taken
+
+    @classmethod
+    def reserved(cls, conn, account_numbers):
+        """The given numbers that a block already handed to some allocator may produce."""
+        row = conn.execute("SELECT next_value FROM sequences WHERE name = ?", (cls.SEQUENCE,)).fetchone()
+        next_value = row[0] if row else 1
+        return {number for number in account_numbers
+                if len(number) == 10 and number.isdigit() and int(number[:9]) < next_value
+                and luhn_check_digit(number[:9]) == number[9]}
+
+    def allocate(self):
+        with self._lock:
+            while True:
+                if self._next >= self._end:
+                    self._reserve_block()
+                payload = f"{self._next:09d}"
+                self._next += 1
+                number = payload + luhn_check_digit(payload)
+                if number not in self._taken:
+                    return number
+
+
+class AccountCache:
+    """Bounded LRU of account rows with a TTL, for read-through lookups.
+
+    Writers invalidate an entry after they commit. A lookup that was
+    already reading the database when the invalidation happened doesn't
+    store its (possibly old) row, so the cache never serves a balance older
+    than the last write made through this process.
+
+    Balance writes can instead bracket their transaction with begin_write()
+    and end_write(), which stores the committed balance in the cached row,
+    so a busy account stays cached. If another write to the same account
+    overlapped, the order of the commits isn't known and the entry is
+    dropped as with invalidate().
+    """
+
+    def __init__(self, max_size=10000, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._loading = {}  # account_number -> [in-flight loads, invalidated meanwhile]
+        self._writes = {}  # account_number -> [writes in flight, generation]
+        self._lock = threading.Lock()
+
+    def get(self, account_number, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(account_number)
+            if entry is not None:
+                row, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(account_number)
+                    self.hits += 1
+                    return row
+                del self._entries[account_number]
+            self.misses += 1
+            loading = self._loading.setdefault(account_number, [0, False])
+            loading[0] += 1
+
+        row = None
+        try:
+            row = loader()
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if loading[0] == 0:
+                    del self._loading[account_number]
+                if row is not None and not loading[1] and self.max_size > 0:
+                    self._entries[account_number] = (row, time.monotonic() + self.ttl)
+                    self._entries.move_to_end(account_number)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return row
+
+    def invalidate(self, *account_numbers):
+        with self._lock:
+            for account_number in account_numbers:
+                self._entries.pop(account_number, None)
+                loading = self._loading.get(account_number)
+                if loading is not None:
+                    loading[1] = True
+                writes = self._writes.get(account_number)
+                if writes is not None:
+                    writes[1] += 1
+
+    def begin_write(self, *account_numbers):
+        """Register balance writes about to start; pass the result to end_write() once they commit or fail."""
+        with self._lock:
+            tokens = []
+            for account_number in account_numbers:
+                writes = self._writes.setdefault(account_number, [0, 0])
+                writes[1] += 1
+                tokens.append((account_number, writes[0] == 0, writes[1]))
+                writes[0] += 1
+            return tokens
+
+    def end_write(self, tokens, balances):
+        """Store each account's committed balance (from balances) in its cached row, or drop the row.
+
+        The row is only updated if no other write to the account was in
+        flight when this one began or started since; accounts missing
+        from balances (e.g. after a failed write) are always dropped.
+        """
+        with self._lock:
+            for account_number, alone, generation in tokens:
+                writes = self._writes[account_number]
+                writes[0] -= 1
+                if writes[0] == 0:
+                    del self._writes[account_number]
+                loading = self._loading.get(account_number)
+                if loading is not None:
+                    loading[1] = True  # A load in flight may have read the row before this commit
+                entry = self._entries.get(account_number)
+                if entry is None:
+                    continue
+                balance = balances.get(account_number)
+                if balance is not None and alone and writes[1] == generation:
+                    row, expires = entry
+                    self._entries[account_number] = (row[:3] + (balance,), expires)
+                else:
+                    del self._entries[account_number]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for loading in self._loading.values():
+                loading[1] = True
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Transaction types. amount_cents is signed (debits are negative), so
+# SUM(amount_cents) over any range is the net movement for that range.
+TX_OPEN = "open"
+TX_DEPOSIT = "deposit"
+TX_WITHDRAWAL = "withdrawal"
+TX_TRANSFER_OUT = "transfer_out"
+TX_TRANSFER_IN = "transfer_in"
+TX_PIN_CHANGE = "pin_change"
+TX_LEGACY = "legacy"  # Migrated rows whose old details text couldn't be parsed
+
+CENT = Decimal("0.01")
+# Largest single amount accepted, in cents; it bounds each amount, not the balance they add up to
+MAX_CENTS = 10 ** 15
+
+
+def parse_cents(text):
+    """Parse a money amount such as "12.5" into integer cents without rounding."""
+    try:
+        value = Decimal(str(text).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {text}")
+    if not value.is_finite() or value.as_tuple().exponent < -2:
+        raise ValueError(f"Invalid amount: {text}")
+    if value.copy_abs() > MAX_CENTS * CENT:
+        raise ValueError(f"Amount too large: {text}")
+    return int(value / CENT)
+
+
+def format_cents(cents):
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+def describe_transaction(tx_type, amount_cents, counterparty, details=None):
+    amount = format_cents(abs(amount_cents or 0))
+    if tx_type == TX_OPEN:
+        return f"Account created with balance ${amount}"
+    if tx_type == TX_DEPOSIT:
+        return f"Deposit: +${amount}"
+    if tx_type == TX_WITHDRAWAL:
+        return f"Withdrawal: -${amount}"
+    if tx_type == TX_TRANSFER_OUT:
+        return f"Transfer to {counterparty}: -${amount}"
+    if tx_type == TX_TRANSFER_IN:
+        return f"Transfer from {counterparty}: +${amount}"
+    if tx_type == TX_PIN_CHANGE:
+        return "PIN changed"
+    return details or tx_type
 
 
 class Account:
-    def __init__(self, account_number, pin, name, balance):
+    __slots__ = ("account_number", "pin", "name", "balance_cents")
+
+    # Shared by every Account/ATM; swap it with ATM(db=...) to change the path or pragmas
+    db = ConnectionManager()
+    # Optional GroupCommitter for ledger writes, enabled with ATM(group_commit=True)
+    committer = None
+    # Read-through cache for Account.get; every write below invalidates its entry
+    cache = AccountCache()
+
+    def __init__(self, account_number, pin, name, balance_cents):
         self.account_number = account_number
         self.pin = pin
         self.name = name
-        self.balance = balance
+        self.balance_cents = balance_cents
 
     @staticmethod
     def create_table():
-        with sqlite3.connect("atm.db") as conn:
+        with Account.db.connection() as conn:
             conn.execute('''CREATE TABLE IF NOT EXISTS accounts (
                 account_number TEXT PRIMARY KEY,
                 pin TEXT NOT NULL,
                 name TEXT NOT NULL,
-                balance REAL NOT NULL
+                balance_cents INTEGER NOT NULL
             )''')
 
             conn.execute('''CREATE TABLE IF NOT EXISTS transactions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 account_number TEXT,
+                type TEXT NOT NULL,
+                amount_cents INTEGER NOT NULL DEFAULT 0,
+                counterparty TEXT,
                 details TEXT,
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (account_number) REFERENCES accounts(account_number)
             )''')
 
+            conn.execute('''CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                next_value INTEGER NOT NULL
+            )''')
+
+        migrate_schema(Account.db.connection())
+
+        with Account.db.connection() as conn:
+            # Serves per-account history newest-first without a scan or sort,
+            # and per-account date-range aggregates
+            conn.execute('''CREATE INDEX IF NOT EXISTS idx_transactions_account_time
+                ON transactions (account_number, timestamp, id)''')
+
     def save(self):
-        with sqlite3.connect("atm.db") as conn:
+        with self.db.connection() as conn:
             conn.execute(
-                "INSERT INTO accounts (account_number, pin, name, balance) VALUES (?, ?, ?, ?)",
-                (self.account_number, self.pin, self.name, self.balance)
+                "INSERT INTO accounts (account_number, pin, name, balance_cents) VALUES (?, ?, ?, ?)",
+                (self.account_number, self.pin, self.name, self.balance_cents)
             )
 
-    def update_balance(self, new_balance):
-        with sqlite3.connect("atm.db") as conn:
-            conn.execute("UPDATE accounts SET balance = ? WHERE account_number = ?", 
-                         (new_balance, self.account_number))
-        self.balance = new_balance  # Update the instance variable after successful DB update
+    def open(self):
+        """Insert the account and its opening transaction in one commit."""
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT INTO accounts (account_number, pin, name, balance_cents) VALUES (?, ?, ?, ?)",
+                (self.account_number, self.pin, self.name, self.balance_cents))
+            conn.execute(
+                "INSERT INTO transactions (account_number, type, amount_cents) VALUES (?, ?, ?)",
+                (self.account_number, TX_OPEN, self.balance_cents))
+
+    def update_balance(self, new_balance_cents):
+        tokens = self.cache.begin_write(self.account_number)
+        committed = {}
+        try:
+            with self.db.connection() as conn:
+                conn.execute("UPDATE accounts SET balance_cents = ? WHERE account_number = ?",
+                             (new_balance_cents, self.account_number))
+            committed[self.account_number] = new_balance_cents
+        finally:
+            self.cache.end_write(tokens, committed)
+        self.balance_cents = new_balance_cents  # Update the instance variable after successful DB update
+
+    def log_transaction(self, tx_type, amount_cents=0, counterparty=None):
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT INTO transactions (account_number, type, amount_cents, counterparty) VALUES (?, ?, ?, ?)",
+                (self.account_number, tx_type, amount_cents, counterparty))
+
+    def _run_op(self, op):
+        if self.committer is not None:
+            return self.committer.run(op)
+        with self.db.connection() as conn:
+            return op(conn)
+
+    def _ledger_op(self, delta_cents, tx_type):
+        account_number = self.account_number
+
+        def op(conn):
+            # The balance check lives in the WHERE clause, so concurrent
+            # withdrawals can never take the balance below zero.
+            cur = conn.execute(
+                "UPDATE accounts SET balance_cents = balance_cents + ? "
+                "WHERE account_number = ? AND balance_cents + ? >= 0",
+                (delta_cents, account_number, delta_cents))
+            if cur.rowcount == 0:
+                return None
+            conn.execute("INSERT INTO transactions (account_number, type, amount_cents) VALUES (?, ?, ?)",
+                         (account_number, tx_type, delta_cents))
+            return conn.execute("SELECT balance_cents FROM accounts WHERE account_number = ?",
+                                (account_number,)).fetchone()[0]
+        return op
 
-    def log_transaction(self, detail):
-        with sqlite3.connect("atm.db") as conn:
-            conn.execute("INSERT INTO transactions (account_number, details) VALUES (?, ?)", 
-                         (self.account_number, detail))
+    def apply_ledger(self, delta_cents, tx_type):
+        """Change the balance by delta_cents and log it in one commit.
+
+        Returns the new balance in cents, or None if the account would be overdrawn.
+        """
+        tokens = self.cache.begin_write(self.account_number)
+        new_balance = None
+        try:
+            new_balance = self._run_op(self._ledger_op(delta_cents, tx_type))
+        finally:
+            self.cache.end_write(tokens, {self.account_number: new_balance})
+        if new_balance is not None:
+            self.balance_cents = new_balance
+        return new_balance
+
+    def transfer(self, recipient_account_number, amount_cents):
+        """Move amount_cents to another account in one commit.
+
+        Returns the sender's new balance in cents, or None if funds are
+        insufficient. Raises LookupError if the recipient does not exist.
+        """
+        sender = self.account_number
+
+        def op(conn):
+            cur = conn.execute(
+                "UPDATE accounts SET balance_cents = balance_cents - ? "
+                "WHERE account_number = ? AND balance_cents >= ?",
+                (amount_cents, sender, amount_cents))
+            if cur.rowcount == 0:
+                return None
+            cur = conn.execute("UPDATE accounts SET balance_cents = balance_cents + ? WHERE account_number = ?",
+                               (amount_cents, recipient_account_number))
+            if cur.rowcount == 0:
+                raise LookupError("Recipient account not found.")
+            conn.executemany(
+                "INSERT INTO transactions (account_number, type, amount_cents, counterparty) VALUES (?, ?, ?, ?)", [
+                    (sender, TX_TRANSFER_OUT, -amount_cents, recipient_account_number),
+                    (recipient_account_number, TX_TRANSFER_IN, amount_cents, sender),
+                ])
+            # Both new balances, so the cache can keep the recipient (often a busy merchant) warm
+            return dict(conn.execute("SELECT account_number, balance_cents FROM accounts "
+                                     "WHERE account_number IN (?, ?)", (sender, recipient_account_number)))
+
+        tokens = self.cache.begin_write(sender, recipient_account_number)
+        balances = None
+        try:
+            balances = self._run_op(op)
+        finally:
+            self.cache.end_write(tokens, balances or {})
+        new_balance = balances[sender] if balances else None
+        if new_balance is not None:
+            self.balance_cents = new_balance
+        return new_balance
+
+    def withdraw(self, amount_cents):
+        return self.apply_ledger(-amount_cents, TX_WITHDRAWAL)
+
+    def deposit(self, amount_cents):
+        return self.apply_ledger(amount_cents, TX_DEPOSIT)
 
     def change_pin(self, new_pin):
-        with sqlite3.connect("atm.db") as conn:
-            conn.execute("UPDATE accounts SET pin = ? WHERE account_number = ?", 
-                        (new_pin, self.account_number))
+        with self.db.connection() as conn:
+            conn.execute("UPDATE accounts SET pin = ? WHERE account_number = ?",
+                         (new_pin, self.account_number))
+        self.cache.invalidate(self.account_number)
         self.pin = new_pin  # Update the instance variable after successful DB update
-        self.log_transaction("PIN changed")
+        self.log_transaction(TX_PIN_CHANGE)
 
     @staticmethod
     def get(account_number):
-        with sqlite3.connect("atm.db") as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM accounts WHERE account_number = ?", (account_number,))
-            row = cur.fetchone()
-            return Account(*row) if row else None
+        def load():
+            with Account.db.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT account_number, pin, name, balance_cents FROM accounts "
+                            "WHERE account_number = ?", (account_number,))
+                return cur.fetchone()
+
+        row = Account.cache.get(account_number, load)
+        return Account(*row) if row else None
 
     @staticmethod
-    def get_transactions(account_number):
-        with sqlite3.connect("atm.db") as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT details, timestamp FROM transactions WHERE account_number = ? ORDER BY timestamp DESC", 
-                       (account_number,))
-            return cur.fetchall()
+    def daily_totals(account_number, day):
+        """Return {type: (count, amount_cents)} for one account and calendar day.
+
+        A single aggregate over the (account_number, timestamp) index range.
+        """
+        start = _db_timestamp(day)[:10]
+        with Account.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT type, COUNT(*), SUM(amount_cents) FROM transactions "
+                "WHERE account_number = ? AND timestamp >= ? AND timestamp < date(?, '+1 day') "
+                "GROUP BY type", (account_number, start, start)).fetchall()
+        return {tx_type: (count, total) for tx_type, count, total in rows}
+
+    @staticmethod
+    def get_transactions(account_number, start=None, end=None, limit=None):
+        return [(detail, timestamp) for detail, timestamp
+                in Account.iter_transactions(account_number, start, end, limit)]
+
+    @staticmethod
+    def get_transactions_page(account_number, cursor=None, start=None, end=None, page_size=50):
+        """Fetch one page of history, newest first, using keyset pagination.
+
+        cursor is the (timestamp, id) returned with the previous page; start is
+        inclusive and end exclusive. Returns (rows, next_cursor), where
+        next_cursor is None once the history is exhausted.
+        """
+        clauses = ["account_number = ?"]
+        params = [account_number]
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_db_timestamp(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(_db_timestamp(end))
+        if cursor is not None:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(cursor)
+        params.append(page_size)
+
+        with Account.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, type, amount_cents, counterparty, details, timestamp FROM transactions "
+                f"WHERE {' AND '.join(clauses)} ORDER BY timestamp DESC, id DESC LIMIT ?", params).fetchall()
+        if len(rows) < page_size:
+            next_cursor = None
+        else:
+            next_cursor = (rows[-1][5], rows[-1][0])
+        return [(describe_transaction(tx_type, amount, counterparty, details), timestamp)
+                for _, tx_type, amount, counterparty, details, timestamp in rows], next_cursor
+
+    @staticmethod
+    def iter_transactions(account_number, start=None, end=None, limit=None, page_size=50):
+        """Yield (details, timestamp) rows newest first, one page in memory at a time."""
+        cursor = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            rows, cursor = Account.get_transactions_page(account_number, cursor, start, end, size)
+            yield from rows
+            if remaining is not None:
+                remaining -= len(rows)
+            if cursor is None:
+                return
+
+
+def _db_timestamp(value):
+    # Matches the text format SQLite's CURRENT_TIMESTAMP writes
+    if isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# Migration from the original schema (REAL balances, free-text details)
+LEGACY_DETAILS = (
+    (re.compile(r"Account created with balance \$(\d+(?:\.\d+)?)"), TX_OPEN, 1),
+    (re.compile(r"Deposit: \+\$(\d+(?:\.\d+)?)"), TX_DEPOSIT, 1),
+    (re.compile(r"Withdrawal: -\$(\d+(?:\.\d+)?)"), TX_WITHDRAWAL, -1),
+    (re.compile(r"Transfer to (\S+): -\$(\d+(?:\.\d+)?)"), TX_TRANSFER_OUT, -1),
+    (re.compile(r"Transfer from (\S+): \+\$(\d+(?:\.\d+)?)"), TX_TRANSFER_IN, 1),
+)
+
+
+def _parse_legacy_details(details):
+    """Map an old details string to (type, amount_cents, counterparty, details)."""
+    if details == "PIN changed":
+        return TX_PIN_CHANGE, 0, None, None
+    for pattern, tx_type, sign in LEGACY_DETAILS:
+        match = pattern.fullmatch(details or "")
+        if match:
+            *counterparty, amount = match.groups()
+            try:
+                amount_cents = parse_cents(amount)
+            except ValueError:
+                break  # Over MAX_CENTS or finer than a cent: keep the text rather than abort the migration
+            return tx_type, sign * amount_cents, (counterparty or [None])[0], None
+    return TX_LEGACY, 0, None, details
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def migrate_schema(conn, chunk_size=10000):
+    """Convert an atm.db written by the original schema in place.
+
+    Balances become integer cents and every transaction's details text is
+    parsed into type/amount_cents/counterparty. Runs in one transaction and
+    does nothing if the database is already current. Returns the number of
+    (accounts, transactions) rows migrated, or None if nothing was needed.
+    """
+    accounts_columns = _columns(conn, "accounts")
+    transactions_columns = _columns(conn, "transactions")
+    if not accounts_columns or not transactions_columns:
+        return None  # Fresh database, create_table builds the current schema
+    if "balance_cents" in accounts_columns and "type" in transactions_columns:
+        return None
+
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        accounts = 0
+        if "balance_cents" not in _columns(conn, "accounts"):
+            conn.execute('''CREATE TABLE accounts_new (
+                account_number TEXT PRIMARY KEY,
+                pin TEXT NOT NULL,
+                name TEXT NOT NULL,
+                balance_cents INTEGER NOT NULL
+            )''')
+            accounts = conn.execute(
+                "INSERT INTO accounts_new (account_number, pin, name, balance_cents) "
+                "SELECT account_number, pin, name, CAST(ROUND(balance * 100) AS INTEGER) FROM accounts").rowcount
+            conn.execute("DROP TABLE accounts")
+            conn.execute("ALTER TABLE accounts_new RENAME TO accounts")
+
+        transactions = 0
+        if "type" not in _columns(conn, "transactions"):
+            conn.execute('''CREATE TABLE transactions_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_number TEXT,
+                type TEXT NOT NULL,
+                amount_cents INTEGER NOT NULL DEFAULT 0,
+                counterparty TEXT,
+                details TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (account_number) REFERENCES accounts(account_number)
+            )''')
+            old_rows = conn.execute("SELECT id, account_number, details, timestamp FROM transactions")
+            while chunk := old_rows.fetchmany(chunk_size):
+                conn.executemany(
+                    "INSERT INTO transactions_new (id, account_number, type, amount_cents, counterparty, "
+                    "details, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(tx_id, acc, *_parse_legacy_details(details), timestamp)
+                     for tx_id, acc, details, timestamp in chunk])
+                transactions += len(chunk)
+            conn.execute("DROP TABLE transactions")
+            conn.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    return accounts, transactions
 
 
 class ATM:
-    def __init__(self):
+    def __init__(self, db=None, group_commit=False, cache=None):
+        if db is not None:
+            Account.db = db
+            Account.cache.clear()  # Rows cached from another database are meaningless
+        if cache is not None:
+            Account.cache = cache
+        if group_commit and Account.committer is None:
+            Account.committer = GroupCommitter(Account.db)
         Account.create_table()
+        self.allocator = AccountNumberAllocator(Account.db)
         self.current_account = None
 
     def generate_account_number(self):
-        random.seed(time.time())
-        return ''.join(str(random.randint(0, 9)) for _ in range(10))
+        return self.allocator.allocate()
 
     def create_account(self):
         print("\nCreate New Account")
@@ -91,8 +770,8 @@ class ATM:
 
         while True:
             try:
-                balance = float(input("Enter initial deposit amount: $"))
-                if balance > 0:
+                balance_cents = parse_cents(input("Enter initial deposit amount: $"))
+                if balance_cents > 0:
                     break
                 else:
                     print("Amount must be positive.")
@@ -100,9 +779,7 @@ class ATM:
                 print("Invalid amount. Try again.")
 
         acc_num = self.generate_account_number()
-        account = Account(acc_num, pin, name, balance)
-        account.save()
-        account.log_transaction(f"Account created with balance ${balance:.2f}")
+        Account(acc_num, pin, name, balance_cents).open()
         print(f"\nAccount created successfully!\nYour account number is: {acc_num}")
 
     def login(self):
@@ -150,37 +827,31 @@ class ATM:
                 print("Invalid choice.")
 
     def check_balance(self):
-        print(f"\nBalance: ${self.current_account.balance:.2f}")
+        print(f"\nBalance: ${format_cents(self.current_account.balance_cents)}")
 
     def withdraw(self):
         try:
-            amount = float(input("\nEnter amount to withdraw: $"))
+            amount = parse_cents(input("\nEnter amount to withdraw: $"))
             if amount <= 0:
                 print("Amount must be positive.")
                 return
-            if amount > self.current_account.balance:
+
+            # Balance check, update and log happen in a single commit
+            if self.current_account.withdraw(amount) is None:
                 print("Insufficient balance.")
                 return
-            
-            # Update balance in database first
-            new_balance = self.current_account.balance - amount
-            self.current_account.update_balance(new_balance)
-            self.current_account.log_transaction(f"Withdrawal: -${amount:.2f}")
             print("Withdrawal successful.")
         except ValueError:
             print("Invalid input.")
 
     def deposit(self):
         try:
-            amount = float(input("\nEnter amount to deposit: $"))
+            amount = parse_cents(input("\nEnter amount to deposit: $"))
             if amount <= 0:
                 print("Amount must be positive.")
                 return
-            
-            # Update balance in database first
-            new_balance = self.current_account.balance + amount
-            self.current_account.update_balance(new_balance)
-            self.current_account.log_transaction(f"Deposit: +${amount:.2f}")
+
+            self.current_account.deposit(amount)
             print("Deposit successful.")
         except ValueError:
             print("Invalid input.")
@@ -198,56 +869,41 @@ class ATM:
             return
 
         try:
-            amount = float(input("Enter amount to transfer: $"))
+            amount = parse_cents(input("Enter amount to transfer: $"))
             if amount <= 0:
                 print("Amount must be positive.")
                 return
-            if amount > self.current_account.balance:
+
+            try:
+                new_balance = self.current_account.transfer(recipient.account_number, amount)
+            except (LookupError, sqlite3.Error) as e:
+                print("Transfer failed. Please try again.")
+                print(f"Error: {str(e)}")
+                return
+            if new_balance is None:
                 print("Insufficient funds.")
                 return
-
-            # Start transaction
-            with sqlite3.connect("atm.db") as conn:
-                try:
-                    # Update sender balance
-                    sender_new_balance = self.current_account.balance - amount
-                    conn.execute("UPDATE accounts SET balance = ? WHERE account_number = ?",
-                                (sender_new_balance, self.current_account.account_number))
-                    
-                    # Update recipient balance
-                    recipient_new_balance = recipient.balance + amount
-                    conn.execute("UPDATE accounts SET balance = ? WHERE account_number = ?",
-                                (recipient_new_balance, recipient.account_number))
-                    
-                    # Log transactions
-                    conn.execute("INSERT INTO transactions (account_number, details) VALUES (?, ?)",
-                               (self.current_account.account_number, f"Transfer to {recipient_acc}: -${amount:.2f}"))
-                    conn.execute("INSERT INTO transactions (account_number, details) VALUES (?, ?)",
-                               (recipient.account_number, f"Transfer from {self.current_account.account_number}: +${amount:.2f}"))
-                    
-                    # Commit transaction
-                    conn.commit()
-                    
-                    # Update local objects
-                    self.current_account.balance = sender_new_balance
-                    recipient.balance = recipient_new_balance
-                    
-                    print("Transfer successful.")
-                except Exception as e:
-                    conn.rollback()
-                    print("Transfer failed. Please try again.")
-                    print(f"Error: {str(e)}")
+            print("Transfer successful.")
         except ValueError:
             print("Invalid input.")
 
-    def show_transaction_history(self):
-        transactions = Account.get_transactions(self.current_account.account_number)
-        print(f"\nTransaction History for {self.current_account.account_number}")
-        if not transactions:
+    def show_transaction_history(self, page_size=20):
+        account_number = self.current_account.account_number
+        print(f"\nTransaction History for {account_number}")
+        rows, cursor = Account.get_transactions_page(account_number, page_size=page_size)
+        if not rows:
             print("No transactions.")
-        else:
-            for detail, timestamp in transactions:
+            return
+        while True:
+            for detail, timestamp in rows:
                 print(f"[{timestamp}] {detail}")
+            if cursor is None:
+                return
+            if input("Show more? (y/n): ").strip().lower() != "y":
+                return
+            rows, cursor = Account.get_transactions_page(account_number, cursor, page_size=page_size)
+            if not rows:
+                return
 
     def change_pin(self):
         new_pin = input("\nEnter new 4-digit PIN: ")
@@ -262,8 +918,235 @@ class ATM:
             print("PINs do not match.")
 
 
-def main():
-    atm = ATM()
+# Bulk operations
+SQLITE_MAX_PARAMS = 900  # Stay under SQLite's default host-parameter limit
+
+
+def read_records(path):
+    """Yield dicts from a .csv (with header) or .jsonl/.ndjson file, one line at a time."""
+    suffix = Path(path).suffix.lower()
+    with open(path, newline="") as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported file format: {suffix} (use .csv or .jsonl)")
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _existing_accounts(conn, account_numbers):
+    found = set()
+    account_numbers = list(account_numbers)
+    for i in range(0, len(account_numbers), SQLITE_MAX_PARAMS):
+        part = account_numbers[i:i + SQLITE_MAX_PARAMS]
+        found.update(row[0] for row in conn.execute(
+            f"SELECT account_number FROM accounts WHERE account_number IN ({','.join('?' * len(part))})",
+            part))
+    return found
+
+
+def _load_balances(conn, account_numbers):
+    balances = {}
+    account_numbers = list(account_numbers)
+    for i in range(0, len(account_numbers), SQLITE_MAX_PARAMS):
+        part = account_numbers[i:i + SQLITE_MAX_PARAMS]
+        balances.update(conn.execute(
+            f"SELECT account_number, balance_cents FROM accounts WHERE account_number IN ({','.join('?' * len(part))})",
+            part))
+    return balances
+
+
+def import_accounts(records, chunk_size=10000, allocator=None):
+    """Insert accounts from dicts with account_number, pin, name and balance (in dollars).
+
+    Each chunk is one transaction written with executemany. Invalid rows and
+    account numbers that already exist are skipped and reported, not fatal.
+    Rows with an empty account_number get one from allocator, if given.
+    Explicit numbers inside a sequence block that was already reserved are
+    rejected, since a live allocator could hand them out again.
+    Returns (imported, rejected) where rejected is a list of (row, reason).
+    """
+    imported = 0
+    rejected = []
+    row_no = 0
+    conn = Account.db.connection()
+    for chunk in _chunks(records, chunk_size):
+        valid = []
+        allocated = set()
+        for record in chunk:
+            row_no += 1
+            try:
+                account_number = str(record.get("account_number") or "").strip()
+                if not account_number and allocator is not None:
+                    account_number = allocator.allocate()
+                    allocated.add(row_no)
+                pin = str(record["pin"]).strip()
+                name = str(record["name"]).strip()
+                balance_cents = parse_cents(record["balance"])
+            except (KeyError, TypeError, ValueError):
+                rejected.append((row_no, "missing or malformed field"))
+                continue
+            if not account_number:
+                rejected.append((row_no, "missing account number"))
+            elif not (pin.isdigit() and len(pin) == 4):
+                rejected.append((row_no, "PIN must be 4 digits"))
+            elif balance_cents <= 0:
+                rejected.append((row_no, "balance must be positive"))
+            else:
+                valid.append((row_no, account_number, pin, name, balance_cents))
+
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            taken = _existing_accounts(conn, {row[1] for row in valid})
+            reserved = AccountNumberAllocator.reserved(conn, {row[1] for row in valid if row[0] not in allocated})
+            rows = []
+            for row_no_, account_number, pin, name, balance_cents in valid:
+                if account_number in taken:
+                    rejected.append((row_no_, "account number already exists"))
+                    continue
+                if account_number in reserved and row_no_ not in allocated:
+                    rejected.append((row_no_, "account number is reserved for allocation"))
+                    continue
+                taken.add(account_number)
+                rows.append((account_number, pin, name, balance_cents))
+            conn.executemany(
+                "INSERT INTO accounts (account_number, pin, name, balance_cents) VALUES (?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO transactions (account_number, type, amount_cents) VALUES (?, ?, ?)",
+                             [(row[0], TX_OPEN, row[3]) for row in rows])
+        imported += len(rows)
+    return imported, rejected
+
+
+def apply_transfers(records, batch_size=5000):
+    """Apply transfers from dicts with from_account, to_account and amount (in dollars).
+
+    Each batch is one transaction: the balances of every account it touches
+    are read with one query, transfers are applied in order in memory, and
+    the final balances and log rows are written back with executemany. A row
+    that would overdraw its sender (or is otherwise invalid) is rejected on
+    its own without aborting the rest of the batch.
+    Returns (applied, rejected) where rejected is a list of (row, reason).
+    """
+    applied = 0
+    rejected = []
+    row_no = 0
+    conn = Account.db.connection()
+    for chunk in _chunks(records, batch_size):
+        parsed = []
+        for record in chunk:
+            row_no += 1
+            try:
+                parsed.append((row_no, str(record["from_account"]).strip(),
+                               str(record["to_account"]).strip(), parse_cents(record["amount"])))
+            except (KeyError, TypeError, ValueError):
+                rejected.append((row_no, "missing or malformed field"))
+
+        accounts = {acc for row in parsed for acc in row[1:3]}
+        tokens = Account.cache.begin_write(*accounts)
+        committed = {}
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                balances = _load_balances(conn, accounts)
+                touched = set()
+                log = []
+                for row_no_, sender, recipient, amount in parsed:
+                    if amount <= 0:
+                        rejected.append((row_no_, "amount must be positive"))
+                    elif sender == recipient:
+                        rejected.append((row_no_, "cannot transfer to the same account"))
+                    elif sender not in balances or recipient not in balances:
+                        rejected.append((row_no_, "account not found"))
+                    elif balances[sender] < amount:
+                        rejected.append((row_no_, "insufficient funds"))
+                    else:
+                        balances[sender] -= amount
+                        balances[recipient] += amount
+                        touched.update((sender, recipient))
+                        log.append((sender, TX_TRANSFER_OUT, -amount, recipient))
+                        log.append((recipient, TX_TRANSFER_IN, amount, sender))
+                        applied += 1
+                conn.executemany("UPDATE accounts SET balance_cents = ? WHERE account_number = ?",
+                                 [(balances[acc], acc) for acc in touched])
+                conn.executemany("INSERT INTO transactions (account_number, type, amount_cents, counterparty) "
+                                 "VALUES (?, ?, ?, ?)", log)
+            committed = balances
+        finally:
+            Account.cache.end_write(tokens, committed)
+    return applied, rejected
+
+
+def _write_rejects(path, rejected):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row", "reason"])
+        writer.writerows(sorted(rejected))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATM System")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database file")
+    parser.add_argument("--synchronous", default="NORMAL", choices=ConnectionManager.SYNCHRONOUS_MODES,
+                        help="SQLite synchronous pragma")
+    parser.add_argument("--cache-size", type=int, default=-16000,
+                        help="SQLite cache_size pragma (negative = KiB)")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="Batch concurrent ledger writes into shared commits; pays off with "
+                             "synchronous=FULL and many concurrent writers, not for a single session")
+    parser.add_argument("--account-cache-size", type=int, default=10000,
+                        help="Accounts kept in the lookup cache (0 disables it)")
+    parser.add_argument("--account-cache-ttl", type=float, default=30.0,
+                        help="Seconds a cached account stays valid")
+    commands = parser.add_subparsers(dest="command")
+
+    import_parser = commands.add_parser("import-accounts", help="Bulk-load accounts from CSV/JSONL")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--chunk-size", type=int, default=10000)
+    import_parser.add_argument("--rejects", help="Write rejected rows to this CSV file")
+
+    transfer_parser = commands.add_parser("apply-transfers", help="Apply a CSV/JSONL file of transfers")
+    transfer_parser.add_argument("file")
+    transfer_parser.add_argument("--batch-size", type=int, default=5000)
+    transfer_parser.add_argument("--rejects", help="Write rejected rows to this CSV file")
+
+    commands.add_parser("migrate", help="Convert a database from the original REAL/free-text schema")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrated = migrate_schema(ConnectionManager(args.db).connection())
+        if migrated is None:
+            print("Database is already up to date.")
+        else:
+            print(f"Migrated {migrated[0]} accounts and {migrated[1]} transactions.")
+        return
+
+    atm = ATM(ConnectionManager(args.db, synchronous=args.synchronous, cache_size=args.cache_size),
+              group_commit=args.group_commit,
+              cache=AccountCache(args.account_cache_size, args.account_cache_ttl))
+
+    if args.command in ("import-accounts", "apply-transfers"):
+        start = time.perf_counter()
+        if args.command == "import-accounts":
+            done, rejected = import_accounts(read_records(args.file), args.chunk_size, atm.allocator)
+            label = "Imported"
+        else:
+            done, rejected = apply_transfers(read_records(args.file), args.batch_size)
+            label = "Applied"
+        elapsed = time.perf_counter() - start
+        print(f"{label} {done} rows, rejected {len(rejected)} in {elapsed:.2f}s")
+        if args.rejects and rejected:
+            _write_rejects(args.rejects, rejected)
+            print(f"Rejected rows written to {args.rejects}")
+        return
+
     while True:
         print("\nWelcome to the ATM System")
         print("1. Login")
@@ -0,0 +1,126 @@
+"""Benchmark mixed deposit/withdraw throughput of the ATM storage layer.
+
+Compares the original connect-per-call access pattern against the pooled
+ConnectionManager used by Account, with single-commit ledger operations
+run from one thread and from --threads worker threads, with and without
+group commit, so group commit is measured against the same concurrency.
+Group commit wins with --synchronous FULL and many threads; at NORMAL the
+threaded runs are close and a single thread is fastest.
+
+    python benchmark.py --ops 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from atm_system import TX_DEPOSIT, TX_WITHDRAWAL, Account, ConnectionManager, GroupCommitter
+
+ACCOUNTS = 100
+START_BALANCE = 100_000_000  # cents
+
+
+def seed(path):
+    Account.db = ConnectionManager(path)
+    Account.cache.clear()
+    Account.create_table()
+    for i in range(ACCOUNTS):
+        Account(f"{i:010d}", "1234", f"User {i}", START_BALANCE).save()
+    Account.db.close_all()
+
+
+def operations(ops):
+    rng = random.Random(42)
+    for _ in range(ops):
+        yield f"{rng.randrange(ACCOUNTS):010d}", rng.choice((-1, 1)) * rng.randint(1, 10000)
+
+
+def run_legacy(path, ops):
+    # Reproduces the pre-pool behaviour: a fresh connection per call,
+    # one commit for the balance update and another for the log row.
+    balances = {f"{i:010d}": START_BALANCE for i in range(ACCOUNTS)}
+    for acc_num, amount in operations(ops):
+        new_balance = balances[acc_num] + amount
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE accounts SET balance_cents = ? WHERE account_number = ?", (new_balance, acc_num))
+        balances[acc_num] = new_balance
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO transactions (account_number, type, amount_cents) VALUES (?, ?, ?)",
+                         (acc_num, TX_DEPOSIT if amount > 0 else TX_WITHDRAWAL, amount))
+
+
+def run_pooled(path, ops, synchronous, threads=1):
+    # Each worker thread gets its own pooled connection and commits on its own
+    Account.db = ConnectionManager(path, synchronous=synchronous)
+    accounts = {f"{i:010d}": Account.get(f"{i:010d}") for i in range(ACCOUNTS)}
+
+    def apply(op):
+        acc_num, amount = op
+        return accounts[acc_num].apply_ledger(amount, TX_DEPOSIT if amount > 0 else TX_WITHDRAWAL)
+
+    if threads == 1:
+        for op in operations(ops):
+            apply(op)
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(apply, operations(ops)))
+    Account.db.close_all()
+
+
+def run_group_commit(path, ops, synchronous, threads):
+    Account.committer = GroupCommitter(ConnectionManager(path, synchronous=synchronous))
+    try:
+        run_pooled(path, ops, synchronous, threads)
+    finally:
+        Account.committer.close()
+        Account.committer.db.close_all()
+        Account.committer = None
+
+
+def report(label, ops, elapsed):
+    print(f"{label:<28} {ops:>8} ops  {elapsed:8.2f}s  {ops / elapsed:>10.0f} ops/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--synchronous", default="NORMAL", choices=ConnectionManager.SYNCHRONOUS_MODES)
+    parser.add_argument("--threads", type=int, default=32, help="Worker threads for the concurrent runs")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only run the pooled layer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_legacy:
+            legacy_db = os.path.join(tmp, "legacy.db")
+            seed(legacy_db)
+            # seed() switches the file to WAL; put it back to the old default journal
+            with sqlite3.connect(legacy_db) as conn:
+                conn.execute("PRAGMA journal_mode=DELETE")
+            start = time.perf_counter()
+            run_legacy(legacy_db, args.ops)
+            report("connect-per-call (before)", args.ops, time.perf_counter() - start)
+
+        pooled_db = os.path.join(tmp, "pooled.db")
+        seed(pooled_db)
+        start = time.perf_counter()
+        run_pooled(pooled_db, args.ops, args.synchronous)
+        report(f"pooled WAL/{args.synchronous} (after)", args.ops, time.perf_counter() - start)
+
+        threaded_db = os.path.join(tmp, "threaded.db")
+        seed(threaded_db)
+        start = time.perf_counter()
+        run_pooled(threaded_db, args.ops, args.synchronous, args.threads)
+        report(f"pooled x{args.threads}", args.ops, time.perf_counter() - start)
+
+        group_db = os.path.join(tmp, "group.db")
+        seed(group_db)
+        start = time.perf_counter()
+        run_group_commit(group_db, args.ops, args.synchronous, args.threads)
+        report(f"group commit x{args.threads}", args.ops, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
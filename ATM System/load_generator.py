@@ -0,0 +1,97 @@
+"""Load generator for atm_server.py.
+
+Opens many concurrent sessions, logs each one in to an account and fires a
+mix of balance/deposit/withdraw/transfer requests, then reports throughput
+and p50/p99 request latency.
+
+    python load_generator.py --sessions 2000 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def request(reader, writer, line):
+    writer.write(line.encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def create_accounts(host, port, count):
+    reader, writer = await asyncio.open_connection(host, port)
+    numbers = []
+    for i in range(count):
+        reply = await request(reader, writer, f"CREATE 1234 1000 Load User {i}")
+        numbers.append(reply["account_number"])
+    writer.close()
+    return numbers
+
+
+async def run_session(host, port, account_number, accounts, requests, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await request(reader, writer, f"LOGIN {account_number} 1234")
+        for _ in range(requests):
+            kind = rng.random()
+            if kind < 0.25:
+                line = "BALANCE"
+            elif kind < 0.5:
+                line = f"DEPOSIT {rng.randint(1, 50)}"
+            elif kind < 0.75:
+                line = f"WITHDRAW {rng.randint(1, 50)}"
+            else:
+                line = f"TRANSFER {rng.choice(accounts)} {rng.randint(1, 50)}"
+            start = time.perf_counter()
+            reply = await request(reader, writer, line)
+            latencies.append(time.perf_counter() - start)
+            if not reply["ok"]:
+                errors[reply["error"]] = errors.get(reply["error"], 0) + 1
+        writer.write(b"QUIT\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    accounts = await create_accounts(args.host, args.port, args.accounts)
+    latencies = []
+    errors = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(args.host, args.port, accounts[i % len(accounts)], accounts,
+                    args.requests, latencies, errors, random.Random(rng.random()))
+        for i in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Sessions: {args.sessions}  Requests: {len(latencies)}  Time: {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms  "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms  "
+          f"max: {latencies[-1] * 1000:.2f} ms")
+    for error, count in sorted(errors.items()):
+        print(f"Refused ({error}): {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the ATM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=1000, help="Concurrent client sessions")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per session")
+    parser.add_argument("--accounts", type=int, default=200, help="Accounts to create and spread sessions over")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""📦 Export benchmark: write time and file size for each save_results format.
+
+    python export_benchmark.py --count 1000000
+
+Formats whose optional dependency is missing (zstandard, pyarrow) are skipped.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmark import make_emails
+from main import EmailSlicer
+
+CASES = [
+    ("json", None),
+    ("jsonl", None),
+    ("jsonl", "gzip"),
+    ("jsonl", "zstd"),
+    ("csv", None),
+    ("csv", "gzip"),
+    ("csv", "zstd"),
+    ("parquet", None),
+    ("parquet", "zstd"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email Slicer export benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Addresses to analyze and export")
+    args = parser.parse_args()
+
+    slicer = EmailSlicer()
+    slicer.process_emails(make_emails(args.count))
+    print(f"Exporting {len(slicer.results):,} results")
+    print(f"{'format':<10}{'compression':<13}{'seconds':>9}{'MB':>10}{'rows/s':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for format, compression in CASES:
+            start = time.perf_counter()
+            try:
+                filename = slicer.save_results(format, os.path.join(tmp, "results"), compression=compression)
+            except RuntimeError as e:
+                print(f"{format:<10}{compression or '-':<13}  skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(filename) / 1e6
+            print(f"{format:<10}{compression or '-':<13}{elapsed:>9.2f}{size:>10.1f}"
+                  f"{len(slicer.results) / elapsed:>12,.0f}")
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,843 @@
 import re
+import sys
 import json
+import io
 import csv
+import gzip
+import math
+import time
+import hashlib
+import argparse
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import compress, islice, repeat
+from operator import itemgetter, methodcaller
 from pathlib import Path
 
-class EmailSlicer:
+from public_suffix import default_list, split_domain
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+# Compiled once at import; the named groups split the address in the same match that validates it
+EMAIL_PATTERN = re.compile(r'(?P<username>[a-zA-Z0-9._%+-]+)@(?P<domain>[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Fixed column order for streamed output; covers both valid and invalid records
+RESULT_FIELDS = ["email", "username", "domain", "domain_name", "top_level_domain",
+                 "registrable_domain", "is_valid", "error", "analysis_date"]
+FORMAT_EXTENSIONS = {'json': '.json', 'jsonl': '.jsonl', 'csv': '.csv', 'parquet': '.parquet'}
+TEXT_FORMATS = ('json', 'jsonl', 'csv')
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+if pa is not None:
+    PARQUET_SCHEMA = pa.schema(
+        [(name, pa.bool_() if name == 'is_valid' else pa.string()) for name in RESULT_FIELDS]
+    )
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Longest tail that fails to decode only because it is cut off ("-Infinity", a \uXXXX\uXXXX pair)
+TRUNCATION_WINDOW = 12
+INVALID_EMAIL_ERROR = "❌ Invalid email format"
+
+
+def chunked(iterable, size):
+    """📦 Yield lists of up to size items from any iterable"""
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def read_txt(path):
+    """📄 Yield one email per non-empty line"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def read_csv(path):
+    """📄 Yield the email column of a CSV file row by row"""
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            if row.get('email'):
+                yield row['email']
+
+
+def read_jsonl(path):
+    """📄 Yield emails from JSON Lines (objects with an email key, or bare strings)"""
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, dict) and 'email' in item:
+                yield item['email']
+
+
+def iter_json_array(f, buffer_size=1 << 16):
+    """🧩 Incrementally decode the items of a top-level JSON array from a file object"""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def refill():
+        nonlocal buf, pos, eof
+        more = f.read(buffer_size)
+        eof = not more
+        buf, pos = buf[pos:] + more, 0
+
+    refill()
+    pos = JSON_WHITESPACE.match(buf, pos).end()
+    if buf[pos:pos + 1] != '[':
+        raise ValueError("JSON file must contain an array of records")
+    pos += 1
+    while True:
+        pos = JSON_WHITESPACE.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            refill()
+            continue
+        char = buf[pos]
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # Only an error at the very end of the buffer can be an item that is cut off;
+            # anything earlier is malformed input and refilling would just rescan it
+            if eof or (len(buf) - e.pos > TRUNCATION_WINDOW and not e.msg.startswith('Unterminated string')):
+                raise
+            refill()
+            continue
+        if (not eof and len(buf) - end <= TRUNCATION_WINDOW
+                and isinstance(item, (int, float)) and not isinstance(item, bool)):
+            refill()  # A bare number near the end of the buffer may be a cut-off prefix ("1" of "1.5")
+            continue
+        yield item
+        pos = end
+
+
+def read_json(path):
+    """📄 Yield emails from a JSON array of objects without loading the whole file"""
+    with open(path, 'r') as f:
+        for item in iter_json_array(f):
+            if isinstance(item, dict) and 'email' in item:
+                yield item['email']
+
+
+READERS = {
+    '.txt': read_txt,
+    '.csv': read_csv,
+    '.json': read_json,
+    '.jsonl': read_jsonl,
+    '.ndjson': read_jsonl,
+}
+
+
+def iter_emails(path):
+    """📂 Pick a streaming reader by file extension"""
+    reader = READERS.get(Path(path).suffix.lower())
+    if reader is None:
+        raise ValueError("Unsupported file format. Please use txt, csv, json or jsonl.")
+    return reader(path)
+
+
+def valid_record(email, match, analysis_date):
+    """🧾 Result dict for an address that matched EMAIL_PATTERN.
+
+    top_level_domain is the public suffix (co.uk for mail.example.co.uk),
+    domain_name is what precedes it (mail.example) and registrable_domain
+    is the organisation-level domain (example.co.uk).
+    """
+    domain = match['domain']
+    domain_name, suffix, registrable = split_domain(domain)
+    return {
+        "email": email,
+        "username": match['username'],
+        "domain": domain,
+        "domain_name": domain_name,
+        "top_level_domain": suffix,
+        "registrable_domain": registrable,
+        "is_valid": True,
+        "analysis_date": analysis_date
+    }
+
+
+def analyze_chunk(emails, analysis_date):
+    """⚙️ Analyze a list of emails, returning (results, stats).
+
+    Top-level and side-effect free so process-pool workers can run it.
+    Invalid addresses become error records directly; no exception is
+    raised and caught per record.
+    """
+    fullmatch = EMAIL_PATTERN.fullmatch
+    split = default_list().split
+    results = []
+    append = results.append
+    valid = 0
+    for email in emails:
+        match = fullmatch(email)
+        if match is None:
+            append({
+                "email": email,
+                "error": INVALID_EMAIL_ERROR,
+                "is_valid": False,
+                "analysis_date": analysis_date
+            })
+            continue
+        # Same fields as valid_record(), inlined because this is the hot loop
+        domain = match['domain']
+        domain_name, suffix, registrable = split(domain)
+        append({
+            "email": email,
+            "username": match['username'],
+            "domain": domain,
+            "domain_name": domain_name,
+            "top_level_domain": suffix,
+            "registrable_domain": registrable,
+            "is_valid": True,
+            "analysis_date": analysis_date
+        })
+        valid += 1
+    stats = {
+        'total_processed': len(results),
+        'valid_emails': valid,
+        'invalid_emails': len(results) - valid
+    }
+    return results, stats
+
+
+def analyze_chunk_columns(emails, analysis_date, format=None):
+    """⚙️ analyze_chunk for process-pool workers, returning (store, stats, text).
+
+    Result dicts are expensive to pickle and unpickle, so the chunk comes
+    back as a ResultStore (a few arrays plus the chunk's distinct domains)
+    without its emails, which the parent still has. With a text format the
+    worker also renders the output, so serialization runs in parallel too.
+    """
+    results, stats = analyze_chunk(emails, analysis_date)
+    store = ResultStore()
+    store.extend(results)
+    store.emails = []
+    text = render_results(results, format) if format in TEXT_FORMATS else None
+    return store, stats, text
+
+
+def parallel_analyze(chunks, workers, format=None):
+    """🧵 Run analyze_chunk_columns over chunks on a process pool, yielding (store, stats, text) in input order.
+
+    Only about two chunks per worker are in flight at once, so a huge
+    input is never read ahead into memory.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def collect():
+            chunk, future = pending.popleft()
+            store, stats, text = future.result()
+            store.emails = chunk
+            return store, stats, text
+
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(analyze_chunk_columns, chunk, datetime.now().strftime(DATE_FORMAT),
+                                               format)))
+            if len(pending) >= workers * 2:
+                yield collect()
+        while pending:
+            yield collect()
+
+
+class ResultStore:
+    """🗜 Columnar store for analysis results.
+
+    Instead of one dict per record it keeps the email strings plus compact
+    array columns: an interned domain id (the domain table also holds
+    domain_name, public suffix and registrable domain), an interned
+    analysis-date id and a validity byte.
+    Usernames are sliced from the email on demand. Iterating or indexing
+    rebuilds the same dicts process_emails returns.
+    """
+
     def __init__(self):
-        self.results = []
-        self.stats = {
-            'total_processed': 0,
-            'valid_emails': 0,
-            'invalid_emails': 0
-        }
+        self.emails = []
+        self.domain_ids = array('I')
+        self.date_ids = array('I')
+        self.valid = bytearray()
+        self.domains = [None]  # id 0 = invalid record, no domain
+        self.domain_index = {}
+        self.dates = []
+        self.date_index = {}
 
-    def validate_email(self, email):
-        """🔍 Validate email format using advanced regex"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+    def _intern_date(self, date):
+        date_id = self.date_index.get(date)
+        if date_id is None:
+            date_id = self.date_index[date] = len(self.dates)
+            self.dates.append(date)
+        return date_id
 
-    def extract_tld(self, domain):
-        """🌐 Extract top-level domain with improved accuracy"""
-        tld_pattern = r'\.([a-zA-Z]{2,63})$'
-        match = re.search(tld_pattern, domain)
-        return match.group(1) if match else None
-
-    def analyze_email(self, email):
-        """🛠 Perform comprehensive email analysis"""
-        if not self.validate_email(email):
-            raise ValueError("❌ Invalid email format")
-        
-        username, domain = email.split("@", 1)
-        tld = self.extract_tld(domain)
-        domain_parts = domain.split(".")
-        domain_name = ".".join(domain_parts[:-1]) if len(domain_parts) > 1 else domain
-        
+    def extend(self, results):
+        # Column-at-a-time with map() so the per-record work stays in C
+        if not isinstance(results, list):
+            results = list(results)
+        dates = list(map(itemgetter('analysis_date'), results))
+        for date in set(dates) - self.date_index.keys():
+            self._intern_date(date)
+        domains = list(map(dict.get, results, repeat('domain')))  # None for invalid records
+        domain_index = self.domain_index
+        if not domain_index.keys() >= set(domains) - {None}:
+            for result in results:
+                domain = result.get('domain')
+                if domain is not None and domain not in domain_index:
+                    domain_index[domain] = len(self.domains)
+                    self.domains.append((domain, result['domain_name'], result['top_level_domain'],
+                                         result['registrable_domain']))
+        self.emails.extend(map(itemgetter('email'), results))
+        self.date_ids.extend(map(self.date_index.__getitem__, dates))
+        self.domain_ids.extend(map(domain_index.get, domains, repeat(0)))
+        self.valid.extend(map(itemgetter('is_valid'), results))
+
+    def merge(self, other):
+        """Append another store's records, remapping its domain and date ids (no dicts are built)"""
+        domain_index = self.domain_index
+        domain_map = array('I', [0])
+        for row in islice(other.domains, 1, None):
+            domain_id = domain_index.get(row[0])
+            if domain_id is None:
+                domain_id = domain_index[row[0]] = len(self.domains)
+                self.domains.append(row)
+            domain_map.append(domain_id)
+        date_map = array('I', map(self._intern_date, other.dates))
+        self.emails.extend(other.emails)
+        for ids, id_map, other_ids in ((self.domain_ids, domain_map, other.domain_ids),
+                                       (self.date_ids, date_map, other.date_ids)):
+            if id_map == array('I', range(len(id_map))):
+                ids.extend(other_ids)  # Same ids on both sides, e.g. merging into an empty store
+            else:
+                ids.extend(map(id_map.__getitem__, other_ids))
+        self.valid.extend(other.valid)
+
+    def _record(self, i):
+        email = self.emails[i]
+        date = self.dates[self.date_ids[i]]
+        if not self.valid[i]:
+            return {"email": email, "error": INVALID_EMAIL_ERROR, "is_valid": False, "analysis_date": date}
+        domain, domain_name, tld, registrable = self.domains[self.domain_ids[i]]
         return {
             "email": email,
-            "username": username,
+            "username": email[:len(email) - len(domain) - 1],
             "domain": domain,
             "domain_name": domain_name,
             "top_level_domain": tld,
+            "registrable_domain": registrable,
             "is_valid": True,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "analysis_date": date
         }
 
-    def process_emails(self, emails):
-        """⚙️ Process multiple emails efficiently"""
-        batch_results = []
+    def __len__(self):
+        return len(self.emails)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._record(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("result index out of range")
+        return self._record(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._record(i)
+
+    def clear(self):
+        self.__init__()
+
+
+class UniqueCounter:
+    """🔢 Distinct-value counter: an exact set that becomes a HyperLogLog past max_exact values.
+
+    Below the threshold the count is exact. Above it memory is fixed at
+    2**precision one-byte registers (16 KiB by default) and the estimate
+    is within about 1.04 / sqrt(2**precision), i.e. ~0.8%. Values are
+    hashed with hash(), so an estimate is only valid in the process that
+    built it.
+    """
+
+    def __init__(self, max_exact=100_000, precision=14):
+        self.max_exact = max_exact
+        self.precision = precision
+        self.exact = set()
+        self.registers = None
+
+    def update(self, values):
+        if self.registers is None:
+            self.exact.update(values)
+            if len(self.exact) <= self.max_exact:
+                return
+            # Switch to HyperLogLog once the exact set gets big
+            self.registers = bytearray(1 << self.precision)
+            values, self.exact = self.exact, None
+        registers, p = self.registers, self.precision
+        mask, width = (1 << p) - 1, 64 - p
+        for value in values:
+            h = hash(value) & 0xFFFFFFFFFFFFFFFF
+            rank = width - (h >> p).bit_length() + 1
+            if rank > registers[h & mask]:
+                registers[h & mask] = rank
+
+    def __len__(self):
+        if self.registers is None:
+            return len(self.exact)
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+
+
+class EmailAggregates:
+    """📊 Running per-domain/per-organisation/per-TLD counters, updated as each chunk is analyzed.
+
+    Memory grows with the number of distinct domains and TLDs, not with
+    the number of records; unique usernames are counted in fixed memory
+    by a UniqueCounter. Domains, organisations and TLDs are counted
+    case-insensitively, under their lower-cased form.
+    """
+
+    def __init__(self):
+        self.domains = Counter()
+        self.organisations = Counter()
+        self.tlds = Counter()
+        self.invalid_by_domain = Counter()
+        self.usernames = UniqueCounter()
+
+    def update(self, results):
+        if isinstance(results, ResultStore):
+            return self._update_columns(results)
+        valid = list(filter(itemgetter('is_valid'), results))
+        self.usernames.update(map(itemgetter('username'), valid))
+        self._add_domains(Counter(zip(map(itemgetter('domain'), valid), map(itemgetter('top_level_domain'), valid),
+                                      map(itemgetter('registrable_domain'), valid))).items())
+        if len(valid) < len(results):
+            self._add_invalid(result['email'] for result in results if not result['is_valid'])
+
+    def _update_columns(self, store):
+        # Same counts as update() straight from the store's columns, one step per distinct domain
+        domains = store.domains
+        counts = Counter(compress(store.domain_ids, store.valid))
+        self._add_domains(((domain, tld, registrable), count) for (domain, _, tld, registrable), count
+                          in zip(map(domains.__getitem__, counts), counts.values()))
+        self.usernames.update(email[:len(email) - len(domains[domain_id][0]) - 1] for email, domain_id
+                              in zip(compress(store.emails, store.valid), compress(store.domain_ids, store.valid)))
+        if 0 in store.valid:
+            self._add_invalid(email for email, valid in zip(store.emails, store.valid) if not valid)
+
+    def _add_domains(self, counts):
+        # Keys are lower-cased once per distinct (domain, tld, registrable), so B@GMAIL.com counts as gmail.com
+        for (domain, tld, registrable), count in counts:
+            self.domains[domain.lower()] += count
+            self.tlds[tld.lower() if tld else tld] += count
+            # Domains that are themselves a public suffix count as their own organisation
+            self.organisations[(registrable or domain).lower()] += count
+
+    def _add_invalid(self, emails):
+        # Best-effort domain for invalid input, so validity can be grouped by domain
+        domains = Counter(domain if at else '' for _, at, domain in map(methodcaller('rpartition', '@'), emails))
+        for domain, count in domains.items():
+            self.invalid_by_domain[domain.lower()] += count
+
+    def top_domains(self, n=10):
+        return self.domains.most_common(n)
+
+    def top_organisations(self, n=10):
+        """Top registrable domains, so mail.example.co.uk counts towards example.co.uk"""
+        return self.organisations.most_common(n)
+
+    def top_tlds(self, n=10):
+        return self.tlds.most_common(n)
+
+    def unique_usernames(self):
+        return len(self.usernames)
+
+    def validity_by_domain(self, n=10):
+        """Return [(domain, valid, invalid, rate)] for the n domains with the most records"""
+        totals = self.domains + self.invalid_by_domain
+        rows = []
+        for domain, total in totals.most_common(n):
+            valid = self.domains[domain]
+            rows.append((domain, valid, total - valid, valid / total))
+        return rows
+
+    def to_dict(self, n=100):
+        return {
+            "top_domains": self.top_domains(n),
+            "top_organisations": self.top_organisations(n),
+            "top_tlds": self.top_tlds(n),
+            "unique_usernames": self.unique_usernames(),
+            "validity_by_domain": [
+                {"domain": domain, "valid": valid, "invalid": invalid, "validity_rate": rate}
+                for domain, valid, invalid, rate in self.validity_by_domain(n)
+            ],
+        }
+
+
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email, strip_plus=False, fold_gmail_dots=False):
+    """🧹 Build the dedup key for an address.
+
+    The domain is always lower-cased; optionally drop a +tag from the
+    username and, for Gmail, ignore dots and case in the username.
+    """
+    username, at, domain = email.strip().rpartition('@')
+    if not at:
+        return email.strip()
+    domain = domain.lower()
+    if strip_plus:
+        username = username.split('+', 1)[0]
+    if fold_gmail_dots and domain in GMAIL_DOMAINS:
+        username = username.replace('.', '').lower()
+        domain = "gmail.com"
+    return f"{username}@{domain}"
+
+
+class BloomFilter:
+    """🌸 Fixed-size Bloom filter; memory depends only on capacity and error rate"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        """Add key; return True if it was (probably) already present"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        bits, size = self.bits, self.size
+        present = True
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                present = False
+                bits[pos >> 3] |= mask
+        return present
+
+
+class DedupIndex:
+    """🔁 Seen-address index: an exact set that becomes a Bloom filter past max_exact keys.
+
+    Below the threshold dedup is exact. Above it memory stays bounded by
+    the filter size, at the cost of dropping roughly error_rate of the
+    unique addresses as false duplicates.
+    """
+
+    def __init__(self, max_exact=5_000_000, capacity=100_000_000, error_rate=0.001):
+        self.max_exact = max_exact
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact = set()
+        self.bloom = None
+
+    def seen(self, key):
+        """Record key; return True if it was already recorded"""
+        if self.bloom is not None:
+            return self.bloom.add(key)
+        if key in self.exact:
+            return True
+        self.exact.add(key)
+        if len(self.exact) > self.max_exact:
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+            for old_key in self.exact:
+                self.bloom.add(old_key)
+            self.exact = set()
+        return False
+
+
+def open_text_output(filename, compression=None):
+    """📝 Open a text file for writing, optionally through gzip or zstd"""
+    if compression is None:
+        return open(filename, 'w', newline='')
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', newline='', compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd output needs the zstandard package (pip install zstandard)")
+        raw = open(filename, 'wb')
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def output_filename(base, format, compression=None):
+    """🏷 Add the extension for a format (and compression, for text formats)"""
+    filename = base + FORMAT_EXTENSIONS[format]
+    if compression and format != 'parquet':
+        filename += COMPRESSION_EXTENSIONS[compression]
+    return filename
+
+
+def render_results(results, format):
+    """📝 Text for a batch of results in a text format, as ResultWriter.write_text expects it"""
+    if format == 'jsonl':
+        dumps = json.dumps
+        return ''.join([dumps(result) + '\n' for result in results])
+    if format == 'csv':
+        out = io.StringIO(newline='')
+        csv.DictWriter(out, fieldnames=RESULT_FIELDS, restval='', extrasaction='ignore').writerows(results)
+        return out.getvalue()
+    if format == 'json':
+        # Same layout json.dump(indent=2) gives a list; each item carries its leading separator
+        return ''.join([',\n  ' + json.dumps(result, indent=2).replace('\n', '\n  ') for result in results])
+    raise ValueError(f"Not a text format: {format}")
+
+
+class ResultWriter:
+    """✍️ Write result records incrementally as JSON Lines, CSV, a JSON array or Parquet.
+
+    Text formats can be gzip/zstd-compressed on the fly. CSV always uses
+    RESULT_FIELDS, so valid and invalid rows share one header. Parquet
+    (needs pyarrow) is written one row group at a time.
+    """
+
+    def __init__(self, filename, format='jsonl', compression=None, row_group_size=100_000):
+        if format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {format}")
+        self.filename = filename
+        self.format = format
+        self.count = 0
+        if format == 'parquet':
+            if pq is None:
+                raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+            self.row_group_size = row_group_size
+            self.pending = []
+            self.writer = pq.ParquetWriter(filename, PARQUET_SCHEMA, compression=compression or 'snappy')
+            return
+        self.file = open_text_output(filename, compression)
+        if format == 'csv':
+            csv.DictWriter(self.file, fieldnames=RESULT_FIELDS).writeheader()
+        elif format == 'json':
+            self.file.write('[')
+
+    def write(self, results):
+        if self.format != 'parquet':
+            self.write_text(render_results(results, self.format), len(results))
+            return
+        self.pending.extend(results)
+        while len(self.pending) >= self.row_group_size:
+            self._flush_row_group(self.pending[:self.row_group_size])
+            del self.pending[:self.row_group_size]
+
+    def write_text(self, text, count):
+        """Write count results already rendered by render_results (e.g. on a worker process)"""
+        if self.format == 'json' and not self.count and text:
+            text = '\n  ' + text[len(',\n  '):]  # The first item has no separator
+        self.file.write(text)
+        self.count += count
+
+    def _flush_row_group(self, rows):
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=PARQUET_SCHEMA))
+
+    def close(self):
+        if self.format == 'parquet':
+            if self.pending:
+                self._flush_row_group(self.pending)
+                self.pending = []
+            self.writer.close()
+            return
+        if self.format == 'json':
+            self.file.write('\n]' if self.count else ']')
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ProgressReporter:
+    """⏱ Print records/sec at most once per interval"""
+
+    def __init__(self, interval=1.0, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.count = 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, n):
+        self.count += n
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self._print(now)
+
+    def finish(self):
+        self._print(time.perf_counter())
+        print(file=self.stream)
+
+    def _print(self, now):
+        elapsed = max(now - self.start, 1e-9)
+        print(f"\r⏱ {self.count:,} records | {self.count / elapsed:,.0f} records/sec", end='', file=self.stream)
+
+
+class EmailSlicer:
+    def __init__(self, workers=1, dedup=False, strip_plus=False, fold_gmail_dots=False, dedup_index=None):
+        self.workers = workers
+        self.results = ResultStore()
+        self.aggregates = EmailAggregates()
+        self.stats = {
+            'total_processed': 0,
+            'valid_emails': 0,
+            'invalid_emails': 0,
+            'duplicate_emails': 0
+        }
+        # The index lives as long as the slicer, so repeated batches are deduplicated too
+        self.dedup_index = dedup_index or (DedupIndex() if dedup else None)
+        self.strip_plus = strip_plus
+        self.fold_gmail_dots = fold_gmail_dots
+
+    def _unique(self, emails):
+        seen = self.dedup_index.seen
+        strip_plus, fold_gmail_dots = self.strip_plus, self.fold_gmail_dots
         for email in emails:
-            try:
-                result = self.analyze_email(email)
-                batch_results.append(result)
-                self.stats['valid_emails'] += 1
-            except ValueError as e:
-                error_result = {
-                    "email": email,
-                    "error": str(e),
-                    "is_valid": False,
-                    "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                batch_results.append(error_result)
-                self.stats['invalid_emails'] += 1
+            if seen(normalize_email(email, strip_plus, fold_gmail_dots)):
+                self.stats['duplicate_emails'] += 1
+            else:
+                yield email
+
+    def validate_email(self, email):
+        """🔍 Validate email format using advanced regex"""
+        return EMAIL_PATTERN.fullmatch(email) is not None
+
+    def extract_tld(self, domain):
+        """🌐 Extract the public suffix (e.g. co.uk) using the Public Suffix List"""
+        return split_domain(domain)[1]
+
+    def analyze_email(self, email, analysis_date=None):
+        """🛠 Perform comprehensive email analysis in a single regex match"""
+        match = EMAIL_PATTERN.fullmatch(email)
+        if match is None:
+            raise ValueError(INVALID_EMAIL_ERROR)
         
-        self.stats['total_processed'] += len(emails)
-        self.results.extend(batch_results)
+        return valid_record(email, match, analysis_date or datetime.now().strftime(DATE_FORMAT))
+
+    def process_emails(self, emails, workers=None, chunk_size=50000):
+        """⚙️ Process multiple emails efficiently, optionally across worker processes.
+
+        Returns the batch's result dicts: a list, or with workers > 1 a
+        ResultStore, which builds each dict only when it is read.
+        """
+        workers = workers or self.workers
+        batch_results = ResultStore() if workers > 1 else []
+        for chunk_results in self.stream_emails(emails, chunk_size, workers):
+            if workers > 1:
+                batch_results.merge(chunk_results)
+            else:
+                batch_results.extend(chunk_results)
+        if workers > 1:
+            self.results.merge(batch_results)
+        else:
+            self.results.extend(batch_results)
         return batch_results
 
-    def save_results(self, format='json', filename=None):
-        """💾 Save results in multiple formats"""
+    def _merge_stats(self, stats):
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def stream_emails(self, emails, chunk_size=10000, workers=None, aggregate=True):
+        """🌊 Analyze any iterable of emails chunk by chunk, yielding each chunk's result dicts.
+
+        Stats are updated as usual but nothing is kept in self.results, so
+        memory stays flat however long the input is. With workers > 1 the
+        chunks are analyzed on a process pool, still come back in order and
+        are yielded as ResultStores rather than lists.
+        aggregate=False skips the domain/TLD aggregates, whose counters grow
+        with the number of distinct domains.
+        """
+        for results, _ in self._analyze(emails, chunk_size, workers, aggregate):
+            yield results
+
+    def _analyze(self, emails, chunk_size, workers, aggregate, format=None):
+        # (results, rendered text or None) per chunk; workers render text formats themselves
+        workers = workers or self.workers
+        if self.dedup_index is not None:
+            # Drop duplicates before analysis (and before any worker sees them)
+            emails = self._unique(emails)
+        chunks = chunked(emails, chunk_size)
+        if workers > 1:
+            analyzed = parallel_analyze(chunks, workers, format)
+        else:
+            # One timestamp per chunk instead of one strftime per record
+            analyzed = (analyze_chunk(chunk, datetime.now().strftime(DATE_FORMAT)) + (None,) for chunk in chunks)
+        for results, stats, text in analyzed:
+            self._merge_stats(stats)
+            if aggregate:
+                self.aggregates.update(results)
+            yield results, text
+
+    def process_file(self, input_path, output_path, format='jsonl', chunk_size=10000, progress=None,
+                     workers=None, compression=None, aggregate=False):
+        """🚚 Stream a txt/csv/json/jsonl file through the analyzer into any ResultWriter format.
+
+        Aggregates are only collected with aggregate=True, so by default a
+        streaming run holds nothing that grows with the input.
+        """
+        count = 0
+        with ResultWriter(output_path, format, compression) as writer:
+            for batch_results, text in self._analyze(iter_emails(input_path), chunk_size, workers, aggregate,
+                                                     format):
+                if text is None:
+                    writer.write(batch_results)
+                else:
+                    writer.write_text(text, len(batch_results))
+                count += len(batch_results)
+                if progress is not None:
+                    progress.update(len(batch_results))
+        if progress is not None:
+            progress.finish()
+        return count
+
+    def save_aggregates(self, filename, top_n=100):
+        """📊 Save domain/TLD aggregates and overall stats as JSON"""
+        with open(filename, 'w') as f:
+            json.dump({"stats": self.stats, **self.aggregates.to_dict(top_n)}, f, indent=2)
+        return filename
+
+    def save_results(self, format='json', filename=None, include_aggregates=False, compression=None,
+                     chunk_size=50000):
+        """💾 Save results as json/jsonl/csv/parquet, streaming chunk by chunk.
+
+        compression is 'gzip' or 'zstd' (the Parquet codec for parquet). An
+        _aggregates.json file is written alongside if asked.
+        """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"email_results_{timestamp}"
-        
-        if format == 'json':
-            filename += '.json'
-            with open(filename, 'w') as f:
-                json.dump(self.results, f, indent=2)
-        elif format == 'csv':
-            filename += '.csv'
-            with open(filename, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=self.results[0].keys())
-                writer.writeheader()
-                writer.writerows(self.results)
-        
+        if include_aggregates:
+            self.save_aggregates(f"{filename}_aggregates.json")
+
+        filename = output_filename(filename, format, compression)
+        with ResultWriter(filename, format, compression) as writer:
+            for chunk in chunked(self.results, chunk_size):
+                writer.write(chunk)
         return filename
 
     def display_stats(self):
@@ -94,6 +849,22 @@ class EmailSlicer:
         if self.stats['total_processed'] > 0:
             validity_percentage = (self.stats['valid_emails'] / self.stats['total_processed']) * 100
             print(f"📊 Validity Rate: {validity_percentage:.2f}%")
+        if self.dedup_index is not None:
+            print(f"🔁 Duplicates Skipped: {self.stats['duplicate_emails']}")
+        if self.aggregates.domains:
+            print(f"👥 Unique Usernames: {self.aggregates.unique_usernames()}")
+            print("🏢 Top Domains:")
+            for domain, count in self.aggregates.top_domains(5):
+                print(f"   {domain}: {count}")
+            print("🏛 Top Organisations:")
+            for organisation, count in self.aggregates.top_organisations(5):
+                print(f"   {organisation}: {count}")
+            print("🌐 Top TLDs:")
+            for tld, count in self.aggregates.top_tlds(5):
+                print(f"   .{tld}: {count}")
+            print("📉 Validity by Domain:")
+            for domain, valid, invalid, rate in self.aggregates.validity_by_domain(5):
+                print(f"   {domain or '(none)'}: {rate * 100:.2f}% ({valid} valid, {invalid} invalid)")
 
     def display_batch_results(self, batch_results):
         """🖥 Display results for a batch of emails"""
@@ -103,11 +874,57 @@ class EmailSlicer:
                 print(f"👤 Username: {result['username']}")
                 print(f"🏢 Domain: {result['domain_name']}")
                 print(f"🌐 TLD: .{result['top_level_domain']}")
+                if result['registrable_domain']:
+                    print(f"🏛 Organisation: {result['registrable_domain']}")
             else:
                 print(f"\n❌ Invalid Email: {result['email']}")
                 print(f"⚠️ Error: {result['error']}")
 
-def main():
+def run_batch(args):
+    """🚚 Non-interactive streaming run: python main.py --input big.csv --output out.jsonl"""
+    dedup_index = None
+    if args.dedup:
+        dedup_index = DedupIndex(args.dedup_exact_limit, args.dedup_capacity, args.dedup_error_rate)
+    slicer = EmailSlicer(workers=args.workers, strip_plus=args.strip_plus,
+                         fold_gmail_dots=args.fold_gmail_dots, dedup_index=dedup_index)
+    output = args.output or output_filename(
+        f"email_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}", args.format, args.compression)
+    progress = None if args.quiet else ProgressReporter()
+    count = slicer.process_file(args.input, output, args.format, args.chunk_size, progress,
+                                compression=args.compression, aggregate=bool(args.aggregates))
+    print(f"✅ {count:,} results written to {output}")
+    if args.aggregates:
+        slicer.save_aggregates(args.aggregates)
+        print(f"📊 Aggregates written to {args.aggregates}")
+    slicer.display_stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Email Slicer Pro")
+    parser.add_argument("--input", help="Stream this txt/csv/json/jsonl file instead of opening the menu")
+    parser.add_argument("--output", help="Output file for --input (default: auto-named)")
+    parser.add_argument("--format", choices=tuple(FORMAT_EXTENSIONS), default="jsonl",
+                        help="Output format for --input")
+    parser.add_argument("--compression", choices=tuple(COMPRESSION_EXTENSIONS),
+                        help="Compress the --input output (Parquet: column codec)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Records analyzed per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for analysis")
+    parser.add_argument("--dedup", action="store_true", help="Skip addresses already seen")
+    parser.add_argument("--strip-plus", action="store_true", help="Dedup: treat user+tag@ as user@")
+    parser.add_argument("--fold-gmail-dots", action="store_true", help="Dedup: ignore dots in Gmail usernames")
+    parser.add_argument("--dedup-exact-limit", type=int, default=5_000_000,
+                        help="Dedup: exact set size before switching to a Bloom filter")
+    parser.add_argument("--dedup-capacity", type=int, default=100_000_000,
+                        help="Dedup: expected unique addresses, sizes the Bloom filter")
+    parser.add_argument("--dedup-error-rate", type=float, default=0.001,
+                        help="Dedup: Bloom filter false-duplicate rate")
+    parser.add_argument("--aggregates", help="Also write domain/TLD aggregates to this JSON file")
+    parser.add_argument("--quiet", action="store_true", help="Don't print progress")
+    args = parser.parse_args(argv)
+    if args.input:
+        run_batch(args)
+        return
+
     print("""
     📧▄︻デ═══ Email Slicer Pro ════デ︻▄📧
     🔍 Extract usernames, domains, and TLDs from emails
@@ -135,24 +952,17 @@ def main():
             slicer.display_batch_results(batch_results)
             
         elif choice == '2':
-            file_path = input("\n📂 Enter file path (txt/csv/json): ").strip()
+            file_path = input("\n📂 Enter file path (txt/csv/json/jsonl): ").strip()
+            output_path = input("💾 Stream results to a .jsonl/.csv/.parquet file (leave blank to keep in memory): ").strip()
             try:
-                file_ext = Path(file_path).suffix.lower()
-                if file_ext == '.txt':
-                    with open(file_path, 'r') as f:
-                        emails = [line.strip() for line in f if line.strip()]
-                elif file_ext == '.csv':
-                    with open(file_path, 'r') as f:
-                        reader = csv.DictReader(f)
-                        emails = [row['email'] for row in reader if 'email' in row]
-                elif file_ext == '.json':
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                        emails = [item['email'] for item in data if isinstance(item, dict) and 'email' in item]
-                else:
-                    print("⚠️ Unsupported file format. Please use txt, csv, or json.")
+                if output_path:
+                    suffix = Path(output_path).suffix.lower()
+                    format = {'.csv': 'csv', '.parquet': 'parquet', '.json': 'json'}.get(suffix, 'jsonl')
+                    count = slicer.process_file(file_path, output_path, format, progress=ProgressReporter())
+                    print(f"✅ {count:,} results written to {output_path}")
                     continue
-                
+
+                emails = list(iter_emails(file_path))
                 print(f"📄 Found {len(emails)} emails in file.")
                 batch_results = slicer.process_emails(emails)
                 slicer.display_batch_results(batch_results)
@@ -173,12 +983,24 @@ def main():
             print("\n💾 Save Options:")
             print("1. JSON format")
             print("2. CSV format")
-            save_choice = input("Choose format (1-2): ").strip()
+            print("3. JSON Lines format")
+            print("4. Parquet format (needs pyarrow)")
+            save_choice = input("Choose format (1-4): ").strip()
             
-            if save_choice in ('1', '2'):
-                format = 'json' if save_choice == '1' else 'csv'
+            if save_choice in ('1', '2', '3', '4'):
+                format = {'1': 'json', '2': 'csv', '3': 'jsonl', '4': 'parquet'}[save_choice]
                 custom_name = input("Enter custom filename (leave blank for auto): ").strip() or None
-                filename = slicer.save_results(format=format, filename=custom_name)
+                compression = input("Compression (gzip/zstd, leave blank for none): ").strip().lower() or None
+                if compression not in (None, *COMPRESSION_EXTENSIONS):
+                    print("⚠️ Unknown compression. Saving uncompressed.")
+                    compression = None
+                with_aggregates = input("Also export domain/TLD aggregates? (y/n): ").strip().lower() == 'y'
+                try:
+                    filename = slicer.save_results(format=format, filename=custom_name,
+                                                   include_aggregates=with_aggregates, compression=compression)
+                except RuntimeError as e:
+                    print(f"⚠️ {e}")
+                    continue
                 print(f"✅ Results saved to {filename}")
             else:
                 print("⚠️ Invalid choice. Please try again.")
@@ -187,8 +1009,8 @@ def main():
             if slicer.results:
                 save_option = input("\n💾 Save results before exiting? (y/n): ").lower()
                 if save_option == 'y':
-                    format = input("Choose format (json/csv): ").lower()
-                    if format in ('json', 'csv'):
+                    format = input("Choose format (json/jsonl/csv): ").lower()
+                    if format in ('json', 'jsonl', 'csv'):
                         filename = slicer.save_results(format=format)
                         print(f"✅ Results saved to {filename}")
                     else:
@@ -0,0 +1,132 @@
+"""🌐 Offline Public Suffix List lookups for Email Slicer.
+
+The bundled public_suffix_list.dat (https://publicsuffix.org, MPL-2.0) is
+parsed once into a trie keyed by reversed domain labels, so finding the
+public suffix of a domain costs one dict step per label. The parsed trie
+is cached next to the list with marshal, so later runs load it in a few
+milliseconds instead of re-parsing the text.
+"""
+import marshal
+from functools import lru_cache
+from pathlib import Path
+
+PSL_PATH = Path(__file__).with_name("public_suffix_list.dat")
+CACHE_VERSION = 1
+
+# Trie node markers; real labels never contain these characters
+RULE = "$"        # A rule ends at this node
+EXCEPTION = "!"   # An exception rule ("!www.ck") ends at this node
+WILDCARD = "*"
+
+
+def _idna(label):
+    try:
+        return label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+def parse_rules(lines, include_private=False):
+    """🧩 Build the reversed-label trie from PSL text lines"""
+    trie = {}
+    private = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith("// ===BEGIN PRIVATE DOMAINS==="):
+            private = True
+        if not line or line.startswith("//"):
+            continue
+        if private and not include_private:
+            continue
+        rule = line.split()[0].lower()
+        exception = rule.startswith("!")
+        labels = rule.lstrip("!").split(".")
+        # Store IDN rules under their ASCII (punycode) form as well
+        variants = {tuple(labels)}
+        ascii_labels = [_idna(label) if label != WILDCARD else label for label in labels]
+        if None not in ascii_labels:
+            variants.add(tuple(ascii_labels))
+        for variant in variants:
+            node = trie
+            for label in reversed(variant):
+                node = node.setdefault(label, {})
+            node[EXCEPTION if exception else RULE] = True
+    return trie
+
+
+class PublicSuffixList:
+    """🌍 Public suffix / registrable domain lookups over a reversed-label trie"""
+
+    def __init__(self, trie):
+        self.trie = trie
+        # Domains repeat heavily in mailing lists, so memoize per domain
+        self.split = lru_cache(maxsize=1 << 16)(self._split)
+
+    @classmethod
+    def load(cls, path=PSL_PATH, include_private=False, cache=True):
+        """📂 Load the list, using (and refreshing) the marshal cache next to it"""
+        path = Path(path)
+        stat = path.stat()
+        key = [CACHE_VERSION, stat.st_size, stat.st_mtime_ns, include_private]
+        cache_path = path.with_name(path.name + (".private" if include_private else "") + ".cache")
+        if cache:
+            try:
+                cached_key, trie = marshal.loads(cache_path.read_bytes())
+                if cached_key == key:
+                    return cls(trie)
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+        with open(path, encoding="utf-8") as f:
+            trie = parse_rules(f, include_private)
+        if cache:
+            try:
+                cache_path.write_bytes(marshal.dumps([key, trie]))
+            except OSError:
+                pass  # Read-only install; just parse again next time
+        return cls(trie)
+
+    def suffix_length(self, labels):
+        """Number of trailing labels that form the public suffix (at least 1)"""
+        node = self.trie
+        length = 1  # Implicit "*" rule: an unknown TLD is itself a public suffix
+        depth = 0
+        for label in reversed(labels):
+            child = node.get(label)
+            wildcard = node.get(WILDCARD)
+            if child is not None and EXCEPTION in child:
+                return depth  # Exception: the suffix stops one label short
+            if (child is not None and RULE in child) or (wildcard is not None and RULE in wildcard):
+                length = depth + 1
+            node = child if child is not None else wildcard
+            if node is None:
+                break
+            depth += 1
+        return length
+
+    def _split(self, domain):
+        labels = domain.split(".")
+        n = self.suffix_length(domain.lower().split("."))
+        suffix = ".".join(labels[-n:])
+        if n >= len(labels):
+            return "", suffix, None
+        return ".".join(labels[:-n]), suffix, ".".join(labels[-n - 1:])
+
+
+_default = None
+
+
+def default_list():
+    """Process-wide PublicSuffixList, loaded on first use (also inside pool workers)"""
+    global _default
+    if _default is None:
+        _default = PublicSuffixList.load()
+    return _default
+
+
+def split_domain(domain):
+    """✂️ Return (domain_name, public_suffix, registrable_domain) for a domain.
+
+    mail.example.co.uk -> ("mail.example", "co.uk", "example.co.uk").
+    registrable_domain is None when the domain is itself a public suffix.
+    """
+    return default_list().split(domain)
@@ -0,0 +1,55 @@
+"""Sign/verify throughput per JWT algorithm, to pick the cheapest one that is strong enough.
+
+    python benchmark.py --tokens 5000
+
+Needs PyJWT and, for RS256/ES256/EdDSA, the cryptography package.
+"""
+import argparse
+import time
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from main import Keyring, TokenVerifier, generate_token
+
+
+def make_keyrings():
+    keys = {
+        "HS256": b"benchmark-secret-key-of-32-bytes!",
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+    keyrings = {}
+    for algorithm, key in keys.items():
+        keyring = Keyring()
+        keyring.add(f"bench-{algorithm}", algorithm, key, signing=True)
+        keyrings[algorithm] = keyring
+    return keyrings
+
+
+def rate(count, seconds):
+    return f"{count / seconds:>10,.0f}/s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT sign/verify benchmark")
+    parser.add_argument("--tokens", type=int, default=5000, help="Tokens signed and verified per algorithm")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10}{'sign':>13}{'verify':>13}")
+    for algorithm, keyring in make_keyrings().items():
+        start = time.perf_counter()
+        tokens = [generate_token(30, keyring=keyring) for _ in range(args.tokens)]
+        sign_time = time.perf_counter() - start
+
+        verifier = TokenVerifier(keyring=keyring, workers=1)
+        start = time.perf_counter()
+        results = verifier.verify_many(tokens)
+        verify_time = time.perf_counter() - start
+        assert all(result.ok for result in results)
+
+        print(f"{algorithm:<10}{rate(args.tokens, sign_time):>13}{rate(args.tokens, verify_time):>13}")
+
+
+if __name__ == "__main__":
+    main()
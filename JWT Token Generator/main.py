@@ -1,5 +1,14 @@
 import jwt  # PyJWT library for encoding and decoding JWTs
 import datetime  # For setting token expiration time
+import time  # Wall-clock checks for cached token expiry
+import hashlib  # Digest of tokens used as cache keys
+import json  # Reading JWKS keyring files
+import math  # Bloom filter sizing
+import uuid  # Unique token IDs (jti claim)
+import sqlite3  # Persistent revocation list
+import threading  # Lock guarding the shared verification cache
+from collections import OrderedDict, namedtuple  # LRU ordering and structured verification results
+from concurrent.futures import ThreadPoolExecutor  # Thread pool for batch verification
 
 # Secret key used for signing and verifying JWTs.
 # IMPORTANT: In production, keep this secret and store it in environment variables.
@@ -8,23 +17,537 @@ SECRET_KEY = "your-very-secret-key-keep-it-safe!"
 # Algorithm used to sign the JWT. "HS256" means HMAC with SHA-256.
 ALGORITHM = "HS256"
 
-def generate_token(expiration_minutes=1440):
+# One entry of a Keyring: the parsed key objects for a single "kid"
+KeyEntry = namedtuple("KeyEntry", ["kid", "algorithm", "signing_key", "verify_key"])
+
+
+class UnknownKeyError(jwt.InvalidTokenError):
+    """The token's "kid" header does not match any key in the keyring."""
+
+
+class Keyring:
     """
-    Generate a JWT token with only an expiration claim.
+    Set of active signing/verification keys, selected by "kid".
+
+    Keys are parsed once when they are added (PEM, JWK or raw secret), so
+    signing and verifying only do a dict lookup by kid. Supports HS256,
+    RS256, ES256 and EdDSA (the asymmetric ones need the cryptography package).
+    New tokens are signed with the signing key; older keys stay available
+    for verification until they are removed, which makes rotation gradual.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self.signing_kid = None
+
+    def add(self, kid, algorithm, key, signing=False):
+        """
+        Add a key to the keyring.
+
+        Args:
+            kid (str): Key ID written to / read from the token header.
+            algorithm (str): "HS256", "RS256", "ES256" or "EdDSA".
+            key: Secret (HS256), PEM string/bytes or a cryptography key object.
+                A private key can both sign and verify; a public key only verifies.
+            signing (bool): Make this the key used for new tokens.
+        """
+        key = jwt.algorithms.get_default_algorithms()[algorithm].prepare_key(key)
+        self._add(kid, algorithm, key, signing)
+
+    def _add(self, kid, algorithm, key, signing):
+        if isinstance(key, bytes):
+            # HMAC: the same secret signs and verifies
+            entry = KeyEntry(kid, algorithm, key, key)
+        elif hasattr(key, "public_key"):
+            # Private key object; verification only needs its public half
+            entry = KeyEntry(kid, algorithm, key, key.public_key())
+        else:
+            entry = KeyEntry(kid, algorithm, None, key)
+        self._keys[kid] = entry
+        if signing or (self.signing_kid is None and entry.signing_key is not None):
+            self.signing_kid = kid
+
+    def remove(self, kid):
+        """Retire a key; tokens signed with it no longer verify, even from a VerificationCache."""
+        self._keys.pop(kid, None)
+        if self.signing_kid == kid:
+            self.signing_kid = next((k for k, e in self._keys.items() if e.signing_key is not None), None)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a keyring from a JWKS-style JSON file.
+
+        The file looks like {"signing_kid": "2024-06", "keys": [<JWK>, ...]}.
+        Every JWK needs "kid" and "alg". Private JWKs (with "d", or "k" for
+        HS256) can sign. Without "signing_kid", the first private key signs.
+
+        Args:
+            path (str): Path to the JSON file.
+
+        Returns:
+            Keyring: The parsed keyring.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        keyring = cls()
+        for jwk in data["keys"]:
+            parsed = jwt.PyJWK(jwk, algorithm=jwk["alg"])
+            keyring._add(jwk["kid"], jwk["alg"], parsed.key, signing=False)
+        if data.get("signing_kid") is not None:
+            keyring.signing_kid = data["signing_kid"]
+        return keyring
+
+    def get(self, kid):
+        """
+        Find the key for a kid.
+
+        Raises:
+            UnknownKeyError: If no key has that kid.
+        """
+        entry = self._keys.get(kid)
+        if entry is None:
+            raise UnknownKeyError(f"Unknown key id: {kid!r}")
+        return entry
+
+    def is_current(self, entry):
+        """Is this KeyEntry still the keyring's key for its kid (not removed or replaced)?"""
+        return entry is not None and self._keys.get(entry.kid) is entry
+
+    def signing_entry(self):
+        """The KeyEntry used to sign new tokens."""
+        entry = self._keys.get(self.signing_kid)
+        if entry is None or entry.signing_key is None:
+            raise ValueError("Keyring has no private key to sign with.")
+        return entry
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def generate_token(expiration_minutes=1440, keyring=None, claims=None):
+    """
+    Generate a JWT token with exp, iat and jti claims plus any custom claims.
     
     Args:
         expiration_minutes (int): How many minutes before the token expires (default 1440 = 24 hours).
+        keyring (Keyring): Sign with the keyring's signing key and put its
+            "kid" in the header, instead of using SECRET_KEY.
+        claims (dict): Extra claims such as {"sub": "user-42"}. They cannot
+            override exp, iat or jti.
     
     Returns:
         str: The encoded JWT string.
     """
-    # Create the payload with expiration time (exp claim)
+    # Create the payload: custom claims, expiration (exp), issue time (iat) and a unique ID (jti) for revocation
+    now = datetime.datetime.utcnow()
     payload = {
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(minutes=expiration_minutes)
+        **(claims or {}),
+        "exp": now + datetime.timedelta(minutes=expiration_minutes),
+        "iat": now,
+        "jti": uuid.uuid4().hex,
     }
+    if keyring is not None:
+        # Sign with the current key and name it in the header so verifiers can pick it
+        entry = keyring.signing_entry()
+        return jwt.encode(payload, entry.signing_key, algorithm=entry.algorithm, headers={"kid": entry.kid})
     # Encode (sign) the JWT using the secret key and algorithm
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+class VerifyResult(namedtuple("VerifyResult", ["payload", "error"])):
+    """
+    Outcome of verifying one token.
+
+    Attributes:
+        payload (dict | None): The decoded payload if the token is valid.
+        error (jwt.InvalidTokenError | None): The typed PyJWT error otherwise,
+            e.g. jwt.ExpiredSignatureError or jwt.InvalidSignatureError.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class VerificationCache:
+    """
+    Thread-safe LRU cache of already verified tokens.
+
+    Entries are keyed by the SHA-256 digest of the token, so full tokens are
+    never kept in memory. Each entry expires at min(exp, now + ttl) and an
+    expired entry is dropped on lookup, never served. Only successful
+    verifications are cached, and a cache must only be shared by verifiers
+    that trust the same keys.
+
+    Args:
+        maxsize (int): Maximum number of cached tokens; least recently used go first.
+        ttl (float): Upper bound, in seconds, on how long a token stays cached.
+    """
+
+    def __init__(self, maxsize=100_000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # digest -> (payload, expires_at, key_entry)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @staticmethod
+    def _key(token):
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.sha256(token).digest()
+
+    def get(self, token):
+        """
+        Look up a token.
+
+        Returns:
+            dict | None: The cached payload, or None on a miss or expired entry.
+        """
+        entry = self.lookup(token)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, token):
+        """
+        Look up a token along with the key that verified it.
+
+        Returns:
+            tuple | None: (payload, key_entry) or None on a miss or expired
+                entry. key_entry is the Keyring KeyEntry passed to put().
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[2]
+
+    def put(self, token, payload, key_entry=None):
+        """Cache a verified payload (and the KeyEntry that verified it) until min(exp, now + ttl)."""
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at, key_entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token):
+        """Drop a token from the cache (e.g. after it is revoked)."""
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Cache counters.
+
+        Returns:
+            dict: size, hits, misses, evictions, expired and hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class RevokedTokenError(jwt.InvalidTokenError):
+    """The token's "jti" is on the revocation list."""
+
+
+class BloomFilter:
+    """
+    Compact set membership with no false negatives.
+
+    Uses Python's built-in string hashing (double hashing over hash(item)),
+    so it is only valid inside the process that built it; RevocationStore
+    rebuilds it from SQLite on start-up.
+
+    Args:
+        capacity (int): Expected number of items.
+        error_rate (float): Target false positive rate at capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item):
+        h1, h2 = hash(item), hash((item, "bloom")) | 1
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        h1 = hash(item)
+        bits, size = self.bits, self.size
+        # The first probe needs only h1, and most unrevoked IDs stop there
+        position = h1 % size
+        if not bits[position >> 3] & (1 << (position & 7)):
+            return False
+        h2 = hash((item, "bloom")) | 1
+        for i in range(1, self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationStore:
+    """
+    Revoked token IDs (jti): a Bloom filter in front of an exact SQLite table.
+
+    Nearly every check is for a token that was never revoked, and the
+    in-memory Bloom filter answers that without touching SQLite. Only Bloom
+    hits (real revocations and rare false positives) query the exact table.
+    Entries are kept until their token's exp plus a grace period, and
+    expired ones are compacted away automatically as revocations come in
+    (the filter is rebuilt, and grows if needed).
+
+    Args:
+        path (str): SQLite database file.
+        capacity (int): Initial Bloom filter capacity.
+        error_rate (float): Bloom filter false positive rate.
+        compact_interval (float): Seconds between automatic compactions.
+        grace (float): Seconds to keep an entry after its token's exp, to
+            cover verifier leeway.
+    """
+
+    def __init__(self, path="revoked_tokens.db", capacity=1_000_000, error_rate=0.001,
+                 compact_interval=3600, grace=300):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS revoked (jti TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_revoked_expires_at ON revoked (expires_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.compact_interval = compact_interval
+        self.grace = grace
+        self.compact()
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token ID.
+
+        Args:
+            jti (str): The token's "jti" claim.
+            expires_at (float): The token's "exp" (Unix time); the entry is
+                dropped once the token could no longer verify anyway.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO revoked (jti, expires_at) VALUES (?, ?)",
+                               (jti, float(expires_at)))
+            self._conn.commit()
+            self._bloom.add(jti)
+            self._count += 1
+        if self._count > self.capacity or time.time() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def revoke_token(self, payload):
+        """Revoke a decoded token by its jti and exp claims."""
+        self.revoke(payload["jti"], payload["exp"])
+
+    def is_revoked(self, jti):
+        """
+        Check a token ID.
+
+        Returns:
+            bool: True if the jti has been revoked.
+        """
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM revoked WHERE jti = ?", (jti,)).fetchone() is not None
+
+    def compact(self):
+        """Delete expired entries and rebuild the Bloom filter from what is left."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM revoked WHERE expires_at < ?", (now - self.grace,))
+            self._conn.commit()
+            count = self._conn.execute("SELECT COUNT(*) FROM revoked").fetchone()[0]
+            # Leave room to grow so the filter isn't rebuilt on every revoke
+            self.capacity = max(self.capacity, count * 2)
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            for (jti,) in self._conn.execute("SELECT jti FROM revoked"):
+                bloom.add(jti)
+            self._bloom = bloom
+            self._count = count
+            self._last_compact = now
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._conn.close()
+
+
+class TokenVerifier:
+    """
+    Reusable JWT verifier for high-volume callers.
+
+    The signing key is prepared and the decode options are built once, when
+    the verifier is created, instead of on every call. Verification never
+    prints; failures come back as VerifyResult.error.
+
+    Args:
+        key (str | bytes): Secret (or public key) used to verify signatures.
+        algorithms (list[str]): Accepted signing algorithms.
+        options (dict): PyJWT decode options, e.g. {"require": ["exp"]}.
+        leeway (int): Seconds of clock skew tolerated for exp/nbf/iat.
+        audience (str): Expected "aud" claim, if any.
+        issuer (str): Expected "iss" claim, if any.
+        workers (int): Threads used by verify_many.
+        chunk_size (int): Tokens handed to a worker thread at a time.
+        cache (VerificationCache): Optional cache of verified tokens, so a
+            resent token skips decoding and signature checks.
+        keyring (Keyring): Verify with the key named by each token's "kid"
+            header (and only that key's algorithm) instead of key/algorithms.
+        revocations (RevocationStore): Reject tokens whose "jti" was revoked,
+            even when they come from the cache.
+    """
+
+    def __init__(self, key=SECRET_KEY, algorithms=(ALGORITHM,), options=None, leeway=0,
+                 audience=None, issuer=None, workers=4, chunk_size=1024, cache=None, keyring=None,
+                 revocations=None):
+        self.algorithms = list(algorithms)
+        self.keyring = keyring
+        self.revocations = revocations
+        # Prepare the key once; PyJWT accepts an already prepared key as-is
+        self.key = None if keyring is not None else \
+            jwt.algorithms.get_default_algorithms()[self.algorithms[0]].prepare_key(key)
+        self._jwt = jwt.PyJWT(options)
+        self._claim_kwargs = {"leeway": leeway}
+        if audience is not None:
+            self._claim_kwargs["audience"] = audience
+        if issuer is not None:
+            self._claim_kwargs["issuer"] = issuer
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self._executor = None
+
+    def verify(self, token):
+        """
+        Verify and decode a single token.
+
+        Args:
+            token (str): The JWT string to verify.
+
+        Returns:
+            VerifyResult: payload on success, the PyJWT error on failure.
+        """
+        cache = self.cache
+        payload = None
+        if cache is not None:
+            cached = cache.lookup(token)
+            if cached is not None:
+                payload, key_entry = cached
+                if self.keyring is not None and not self.keyring.is_current(key_entry):
+                    # Its key was removed or replaced since it was cached; verify from scratch
+                    cache.invalidate(token)
+                    payload = None
+        if payload is None:
+            try:
+                payload, key_entry = self._decode(token)
+            except jwt.InvalidTokenError as e:
+                return VerifyResult(None, e)
+            if cache is not None:
+                cache.put(token, payload, key_entry)
+        revocations = self.revocations
+        if revocations is not None:
+            jti = payload.get("jti")
+            if jti is not None and revocations.is_revoked(jti):
+                if cache is not None:
+                    cache.invalidate(token)
+                return VerifyResult(None, RevokedTokenError(f"Token {jti} has been revoked"))
+        return VerifyResult(payload, None)
+
+    def _decode(self, token):
+        """Return (payload, KeyEntry used), the entry being None without a keyring."""
+        if self.keyring is None:
+            return self._jwt.decode(token, self.key, algorithms=self.algorithms, **self._claim_kwargs), None
+        # Pick the key by kid; the algorithm is pinned to that key's, never taken from the token
+        entry = self.keyring.get(jwt.get_unverified_header(token).get("kid"))
+        payload = self._jwt.decode(token, entry.verify_key, algorithms=[entry.algorithm], **self._claim_kwargs)
+        return payload, entry
+
+    def _verify_chunk(self, tokens):
+        verify = self.verify
+        return [verify(token) for token in tokens]
+
+    def verify_many(self, tokens):
+        """
+        Verify a batch of tokens across the thread pool.
+
+        Tokens are handed to the workers in chunks so the per-task overhead
+        is paid once per chunk rather than once per token.
+
+        Args:
+            tokens (iterable[str]): JWT strings to verify.
+
+        Returns:
+            list[VerifyResult]: One result per token, in input order.
+        """
+        tokens = list(tokens)
+        size = self.chunk_size
+        if self.workers <= 1 or len(tokens) <= size:
+            return self._verify_chunk(tokens)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jwt-verify")
+        chunks = (tokens[i:i + size] for i in range(0, len(tokens), size))
+        results = []
+        for chunk_results in self._executor.map(self._verify_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        """Shut down the worker threads, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Shared verifier behind verify_token, created on first use
+_default_verifier = None
+
+
 def verify_token(token):
     """
     Verify and decode a JWT token.
@@ -36,16 +559,18 @@ def verify_token(token):
         dict: The decoded payload if valid.
         None: If token is expired or invalid.
     """
-    try:
-        # Decode (verify) the JWT using the secret key and algorithm
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except jwt.ExpiredSignatureError:
+    global _default_verifier
+    if _default_verifier is None:
+        _default_verifier = TokenVerifier()
+    # Decode (verify) the JWT using the prepared secret key and algorithm
+    result = _default_verifier.verify(token)
+    if isinstance(result.error, jwt.ExpiredSignatureError):
         # If the token's expiration time has passed
         print("Error: Token expired")
-    except jwt.InvalidTokenError:
+    elif result.error is not None:
         # If the token signature or structure is invalid
         print("Error: Invalid token")
-    return None
+    return result.payload
 
 # Example usage of the functions
 if __name__ == "__main__":
@@ -57,3 +582,27 @@ if __name__ == "__main__":
     decoded = verify_token(token)
     if decoded:
         print("Decoded payload:", decoded)
+
+    # Verify a batch of tokens without any printing on the hot path
+    with TokenVerifier(workers=4, cache=VerificationCache(maxsize=10_000, ttl=60)) as verifier:
+        results = verifier.verify_many([token, token, token + "x", generate_token(-1)])
+        print("Cache:", verifier.cache.stats())
+    for result in results:
+        print("Valid" if result.ok else f"Rejected: {type(result.error).__name__}")
+
+    # Revoke a token before it expires
+    store = RevocationStore(":memory:")
+    session_token = generate_token(30, claims={"sub": "user-42"})
+    with TokenVerifier(revocations=store) as verifier:
+        store.revoke_token(verifier.verify(session_token).payload)
+        print("Revoked:", type(verifier.verify(session_token).error).__name__)
+    store.close()
+
+    # Rotate keys: sign with the new key while tokens from the old one still verify
+    keyring = Keyring()
+    keyring.add("2024-01", "HS256", "old-secret-key-still-accepted-for-a-while")
+    old_token = generate_token(30, keyring=keyring)
+    keyring.add("2024-06", "HS256", "new-secret-key-used-for-new-tokens", signing=True)
+    new_token = generate_token(30, keyring=keyring)
+    with TokenVerifier(keyring=keyring) as verifier:
+        print("Keyring:", [result.ok for result in verifier.verify_many([old_token, new_token])])
@@ -1,36 +1,202 @@
-import random
+import os
+import sys
+import secrets
 import string
+from pathlib import Path
 
-def generate_password(length=12, use_uppercase=True, use_digits=True, use_special=True):
-    """Generate a secure random password."""
+# The password policy lives next to the strength checker so both tools share one set of rules.
+# Appended, not prepended: that folder's main.py and benchmark.py must not shadow modules of the same name.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "Password Strength Check"))
+from breach_index import default_index  # noqa: E402
+from password_policy import DEFAULT_POLICY, PasswordPolicy  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; bytes.translate covers the pure-Python path
+    np = None
+
+# Passwords generated per batch in generate_passwords, to bound temporary memory
+BATCH_SIZE = 65536
+# Draws generate_password makes before deciding the options can't avoid the weak patterns and breached list
+MAX_ATTEMPTS = 1000
+
+
+def _character_sets(length, use_uppercase, use_digits, use_special, policy):
+    """Return (all_chars, required classes) for the selected options; special characters come from the policy."""
     lower = string.ascii_lowercase
     upper = string.ascii_uppercase if use_uppercase else ""
     digits = string.digits if use_digits else ""
-    special = string.punctuation if use_special else ""
+    special = policy.special_characters if use_special else ""
     
     all_chars = lower + upper + digits + special
+    required = [chars for chars in (upper, digits, special) if chars]
+    if policy.require_lowercase:
+        required.insert(0, lower)
     
-    if not all_chars:
-        raise ValueError("No character types selected for password generation.")
-    
-    # Ensure at least one of each selected type
-    password = []
-    if use_uppercase:
-        password.append(random.choice(upper))
-    if use_digits:
-        password.append(random.choice(digits))
-    if use_special:
-        password.append(random.choice(special))
-    
-    # Fill the rest of the password length
-    password += random.choices(all_chars, k=length - len(password))
-    
-    # Shuffle to avoid predictable patterns
-    random.shuffle(password)
+    if length < len(required):
+        raise ValueError(f"Password length must be at least {len(required)} to include every selected type.")
+    return all_chars, required
+
+
+def _breach_index(breach_index, policy):
+    """The index the strength checker would use for this policy, or None"""
+    if not policy.check_breached:
+        return None
+    return breach_index if breach_index is not None else default_index()
+
+
+def _rejected(password, policy, index):
+    """Would the strength checker flag this password as a common pattern?"""
+    return bool(policy.weak_pattern(password)) or (index is not None and index.find(password) is not None)
+
+
+def generate_password(length=12, use_uppercase=True, use_digits=True, use_special=True, policy=DEFAULT_POLICY,
+                      breach_index=None):
+    """Generate a secure random password.
+
+    Special characters, weak patterns and the breached-password check come
+    from the password policy, so with every option on the result passes the
+    strength checker's rules whenever length is at least policy.min_length.
+    """
+    all_chars, required = _character_sets(length, use_uppercase, use_digits, use_special, policy)
+    index = _breach_index(breach_index, policy)
     
-    return "".join(password)
+    for _ in range(MAX_ATTEMPTS):
+        # Ensure at least one of each selected type
+        password = [secrets.choice(chars) for chars in required]
+        
+        # Fill the rest of the password length
+        password += [secrets.choice(all_chars) for _ in range(length - len(password))]
+        
+        # Shuffle to avoid predictable patterns
+        secrets.SystemRandom().shuffle(password)
+        
+        password = "".join(password)
+        # A weak pattern like "123" or a listed word turns up by chance now and then; draw again
+        if not _rejected(password, policy, index):
+            return password
+    raise ValueError("Could not generate a password without the policy's weak patterns and breached words; "
+                     "try more character types or a different length.")
+
+
+def _uniform_bytes(alphabet, count):
+    """Draw count symbols uniformly from alphabet (bytes) using os.urandom.
+
+    Random bytes at or above the largest multiple of len(alphabet) are
+    rejected, so mapping the rest with % len(alphabet) has no modulo bias.
+    Entropy is read in large blocks and mapped with NumPy, or with
+    bytes.translate (which also drops the rejected bytes) without it.
+    """
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    if np is not None:
+        symbols = np.frombuffer(alphabet, dtype=np.uint8)
+    else:
+        table = bytes(alphabet[i % size] for i in range(limit)) + bytes(256 - limit)
+        rejected = bytes(range(limit, 256))
+    chunks = []
+    have = 0
+    while have < count:
+        # Oversample by the acceptance rate so a single read is usually enough
+        need = count - have
+        block = os.urandom(need * 256 // limit + need // 64 + 64)
+        if np is not None:
+            raw = np.frombuffer(block, dtype=np.uint8)
+            chunk = symbols[raw[raw < limit] % size].tobytes()
+        else:
+            chunk = block.translate(table, rejected)
+        chunks.append(chunk)
+        have += len(chunk)
+    return b"".join(chunks)[:count]
+
+
+def _byte_codes(chars):
+    """Translation tables (to_codes, from_codes) giving each non-ASCII character a spare byte value 128-255.
+
+    Bulk generation works on one byte per character; both tables are
+    empty when chars is plain ASCII.
+    """
+    extra = sorted({char for char in chars if ord(char) > 127})
+    if len(extra) > 128:
+        raise ValueError("At most 128 distinct non-ASCII special characters are supported.")
+    to_codes = {ord(char): 128 + i for i, char in enumerate(extra)}
+    return to_codes, {code: chr(char) for char, code in to_codes.items()}
+
+
+def _place_required(body, length, required):
+    """Overwrite one distinct random position per required class (bytes) in each password (pure Python)."""
+    count = len(body) // length
+    fills = [_uniform_bytes(chars, count) for chars in required]
+    if length <= 256:
+        positions = iter(_uniform_bytes(bytes(range(length)), count * len(required)))
+    else:
+        positions = iter(lambda: secrets.randbelow(length), None)
+    passwords = []
+    for i in range(count):
+        start = i * length
+        password = bytearray(body[start:start + length])
+        taken = []
+        for fill in fills:
+            position = next(positions)
+            while position in taken:
+                position = secrets.randbelow(length)
+            taken.append(position)
+            password[position] = fill[i]
+        passwords.append(password.decode("latin-1"))
+    return passwords
+
+
+def _place_required_numpy(body, length, required):
+    """Vectorized _place_required: random key per position, lowest keys take the required classes."""
+    count = len(body) // length
+    grid = np.frombuffer(body, dtype=np.uint8).reshape(count, length).copy()
+    if required:
+        keys = np.frombuffer(os.urandom(count * length * 8), dtype=np.uint64).reshape(count, length)
+        positions = np.argsort(keys, axis=1)[:, :len(required)]
+        rows = np.arange(count)
+        for column, chars in enumerate(required):
+            fill = np.frombuffer(_uniform_bytes(chars, count), dtype=np.uint8)
+            grid[rows, positions[:, column]] = fill
+    text = grid.tobytes().decode("latin-1")
+    return [text[i:i + length] for i in range(0, len(text), length)]
+
+
+def generate_passwords(n, length=12, use_uppercase=True, use_digits=True, use_special=True, policy=DEFAULT_POLICY,
+                       breach_index=None):
+    """Generate n secure random passwords in bulk.
+
+    Same character rules as generate_password, but entropy is read from
+    os.urandom in large blocks and mapped to characters in bulk instead
+    of one secrets call per character. Each selected class is placed at
+    a distinct random position, so nothing needs shuffling afterwards.
+    Non-ASCII special characters stand in as spare byte values until the
+    passwords are built.
+    A password containing one of the policy's weak patterns, or a listed
+    word when the policy checks breaches, is replaced with a fresh one.
+    """
+    all_chars, required = _character_sets(length, use_uppercase, use_digits, use_special, policy)
+    if n <= 0 or length <= 0:
+        return [""] * max(n, 0)
+    to_codes, from_codes = _byte_codes(all_chars)
+    alphabet = all_chars.translate(to_codes).encode("latin-1")
+    required = [chars.translate(to_codes).encode("latin-1") for chars in required]
+    place = _place_required_numpy if np is not None else _place_required
+    passwords = []
+    for start in range(0, n, BATCH_SIZE):
+        batch = min(BATCH_SIZE, n - start)
+        passwords += place(_uniform_bytes(alphabet, batch * length), length, required)
+    if from_codes:
+        passwords = [password.translate(from_codes) for password in passwords]
+    index = _breach_index(breach_index, policy)
+    if policy.weak_pattern_re is not None or index is not None:
+        for i, password in enumerate(passwords):
+            if _rejected(password, policy, index):
+                passwords[i] = generate_password(length, use_uppercase, use_digits, use_special, policy, index)
+    return passwords
 
 if __name__ == "__main__":
+    # Optional argument: a JSON/TOML password policy file
+    policy = PasswordPolicy.load(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_POLICY
     print("=== Password Generator ===")
     length = int(input("Enter password length: "))
     use_uppercase = input("Include uppercase letters? (y/n): ").lower() == 'y'
@@ -38,7 +204,7 @@ if __name__ == "__main__":
     use_special = input("Include special characters? (y/n): ").lower() == 'y'
     
     try:
-        password = generate_password(length, use_uppercase, use_digits, use_special)
+        password = generate_password(length, use_uppercase, use_digits, use_special, policy)
         print("\nGenerated Password:", password)
     except ValueError as e:
         print("Error:", e)
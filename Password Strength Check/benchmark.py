@@ -0,0 +1,68 @@
+"""⏱ Latency of strong-password generation: the original retry loop vs the constructive generator.
+
+    python benchmark.py --count 20000 --lengths 12 16
+
+Pass --index to include breached-word avoidance in the constructive generator.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from breach_index import BreachedPasswordIndex
+from main import generate_strong_password
+
+
+def legacy_check(password):
+    # The original regex-based check, kept here as the baseline
+    if len(password) < 12:
+        return False
+    for pattern in (r'[A-Z]', r'[a-z]', r'[0-9]', r'[!@#$%^&*(),.?":{}|<>]'):
+        if not re.search(pattern, password):
+            return False
+    return not any(pattern in password.lower() for pattern in ["password", "123", "qwerty", "admin"])
+
+
+def legacy_generate(length, attempts):
+    chars = string.ascii_letters + string.digits + "!@#$%^&*(),.?\":{}|<>"
+    while True:
+        attempts[0] += 1
+        password = ''.join(random.choice(chars) for _ in range(length))
+        if legacy_check(password):
+            return password
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def measure(label, count, generate):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        generate()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    us = [percentile(latencies, pct) * 1e6 for pct in (50, 90, 99, 99.9)] + [latencies[-1] * 1e6]
+    print(f"{label:<28}" + "".join(f"{value:>10.1f}" for value in us))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strong-password generation latency benchmark")
+    parser.add_argument("--count", type=int, default=20000, help="Passwords generated per case")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[12, 16])
+    parser.add_argument("--index", help="Breached-password index for the constructive generator")
+    args = parser.parse_args()
+    index = BreachedPasswordIndex(args.index) if args.index else None
+
+    print(f"{'latency (us)':<28}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}")
+    for length in args.lengths:
+        attempts = [0]
+        measure(f"retry loop, length {length}", args.count, lambda: legacy_generate(length, attempts))
+        print(f"{'':<28}mean attempts {attempts[0] / args.count:.2f}")
+        measure(f"constructive, length {length}", args.count, lambda: generate_strong_password(length, index))
+
+
+if __name__ == "__main__":
+    main()
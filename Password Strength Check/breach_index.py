@@ -0,0 +1,263 @@
+"""🔎 Memory-mapped index of common/breached passwords.
+
+A word list (one password per line, e.g. a 1M+ entry breach corpus) is
+compiled once into a file holding an open-addressing hash table of
+polynomial-hash fingerprints. The table holds every prefix of at least
+MIN_WORD_LENGTH bytes of every listed word, flagged when the prefix is a
+whole word, so it works as a hashed trie. Opening the index just
+memory-maps that file, so it is ready in milliseconds whatever its size,
+and pages the OS has not touched are never loaded.
+
+Finding listed words inside a password rolls the hash across the start
+positions and walks forward from each start only while the text is still
+a listed prefix, which is usually not far: a scan is about linear in the
+password length instead of probing every substring.
+
+    python breach_index.py rockyou.txt breached_passwords.idx
+"""
+import argparse
+import mmap
+import struct
+from array import array
+from itertools import chain
+from pathlib import Path
+
+DEFAULT_INDEX_PATH = Path(__file__).with_name("breached_passwords.idx")
+
+MAGIC = b"PWIX"
+VERSION = 2
+# magic, version, slots, entries, shortest word, longest word (32 bytes keeps the table 8-byte aligned)
+HEADER = struct.Struct("<4sIQQII")
+MIN_WORD_LENGTH = 4  # Shorter fragments match almost everything
+
+# Polynomial hash h = h * BASE + CODE[byte] (mod 2**64): it extends by a byte and rolls across a window in O(1).
+# Each byte enters as a spread-out 64-bit code so even the last one reaches the top bits.
+BASE = 0x9E3779B97F4A7C15
+MASK = (1 << 64) - 1
+CODE = tuple((byte + 1) * 0xD6E8FEB86659FD93 & MASK for byte in range(256))
+# The top bits of a prefix's hash pick its slot; the slot stores the next 31 bits as its key, with bit 0
+# flagging a whole word. 0 marks an empty slot.
+WORD = 1
+KEY = 0xFFFFFFFE
+
+
+def fingerprint(word):
+    """64-bit polynomial hash of a case-folded, UTF-8 encoded word (or prefix)"""
+    h = 0
+    for byte in word:
+        h = (h * BASE + CODE[byte]) & MASK
+    return h
+
+
+def _encode(text):
+    # casefold() works character by character (lower() turns a final Σ into ς), so spans can be mapped back
+    return text.casefold().encode("utf-8", "surrogateescape")
+
+
+def _char_span(text, start, end):
+    """Characters of text covering the byte span start:end of _encode(text); folding can change lengths ('İ')"""
+    position, first = 0, None
+    for index, char in enumerate(text):
+        position += len(_encode(char))
+        if first is None and position > start:
+            first = index
+        if position >= end:
+            return first, index + 1
+
+
+def _fill(wordlist_path, min_length, bits):
+    """Hash every listed prefix into a 2**bits slot table: (table, prefixes, entries, shortest, longest)"""
+    slots, shift = 1 << bits, 64 - bits
+    mask, key_shift = slots - 1, shift - 32
+    table = array("I", bytes(4 * slots))
+    prefixes = entries = 0
+    shortest, longest = 0, 0
+    with open(wordlist_path, encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            word = _encode(line.rstrip("\r\n"))
+            if len(word) < min_length:
+                continue
+            h = fingerprint(word[:min_length - 1])
+            for length in range(min_length, len(word) + 1):
+                h = (h * BASE + CODE[word[length - 1]]) & MASK
+                key = (h >> key_shift) & KEY or 2
+                slot = h >> shift
+                while table[slot] and table[slot] & KEY != key:
+                    slot = (slot + 1) & mask
+                if not table[slot]:
+                    table[slot] = key
+                    prefixes += 1
+                if length == len(word) and not table[slot] & WORD:
+                    table[slot] |= WORD
+                    entries += 1
+            shortest = min(shortest or len(word), len(word))
+            longest = max(longest, len(word))
+    return table, prefixes, entries, shortest, longest
+
+
+class BreachedPasswordIndex:
+    """🛡 Exact (up to hash collisions, about one in 2**31 per lookup) membership for a breached-password list"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.entries, self.min_length, self.max_length = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} breached-password index")
+        self._table = memoryview(self._mmap)[HEADER.size:].cast("I")
+        self._mask = self.slots - 1
+        self._shift = 64 - (self.slots.bit_length() - 1)
+        self._key_shift = self._shift - 32
+        # What the byte leaving a rolled window weighs in its hash; the extra last entry (index -1) weighs nothing
+        drop = pow(BASE, max(self.min_length - 1, 0), 1 << 64)
+        self._leaving = [code * drop & MASK for code in CODE] + [0]
+
+    @classmethod
+    def build(cls, wordlist_path, index_path=DEFAULT_INDEX_PATH, min_length=MIN_WORD_LENGTH):
+        """🏗 Compile a word list (one password per line) into an index file"""
+        bound = 0
+        with open(wordlist_path, encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                bound += max(0, len(_encode(line.rstrip("\r\n"))) - min_length + 1)
+        bits = max(4, (bound * 4 // 3).bit_length())  # Load factor stays at or under 0.75
+        table, prefixes, entries, shortest, longest = _fill(wordlist_path, min_length, bits)
+        # Shared prefixes are stored once, so the bound is usually well over the count: refill a smaller table
+        fitted = max(4, (prefixes * 4 // 3).bit_length())
+        if fitted < bits:
+            table, prefixes, entries, shortest, longest = _fill(wordlist_path, min_length, fitted)
+        with open(index_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(table), entries, shortest, longest))
+            table.tofile(f)
+        return cls(index_path)
+
+    def _lookup(self, h):
+        """Table entry for the prefix hashing to h, or 0 if it isn't listed"""
+        table, mask, key = self._table, self._mask, (h >> self._key_shift) & KEY or 2
+        slot = h >> self._shift
+        stored = table[slot]
+        while stored and stored & KEY != key:
+            slot = (slot + 1) & mask
+            stored = table[slot]
+        return stored
+
+    def _walk(self, data, start, h, stored):
+        """Extend the listed prefix data[start:start + min_length] (hash h, table entry stored) byte by byte.
+
+        Returns the end of the longest listed word found on the way, or
+        None; stops at the first extension that is no longer a listed prefix.
+        """
+        found = None
+        position = start + self.min_length
+        end = min(len(data), start + self.max_length)
+        while True:
+            if stored & WORD:
+                found = position
+            if position >= end:
+                return found
+            h = (h * BASE + CODE[data[position]]) & MASK
+            position += 1
+            stored = self._lookup(h)
+            if not stored:
+                return found
+
+    def _ends(self, data, first, last):
+        """(start, end) of the longest listed word starting at each of first..last that has one.
+
+        One pass: the min_length-byte window hash rolls from start to start
+        and is probed inline; only a window that is a listed prefix is walked.
+        """
+        if last < first or not self.entries:
+            return
+        table, mask, shift, key_shift = self._table, self._mask, self._shift, self._key_shift
+        weight, width = self._leaving, self.min_length
+        # The first window's outgoing byte is a virtual -1, which weighs nothing in the hash
+        h = fingerprint(data[first:first + width - 1])
+        leaving = chain((-1,), data[first:last])
+        entering = data[first + width - 1:last + width]
+        for start, out, byte in zip(range(first, last + 1), leaving, entering):
+            h = ((h - weight[out]) * BASE + CODE[byte]) & MASK
+            key = (h >> key_shift) & KEY or 2
+            slot = h >> shift
+            stored = table[slot]
+            while stored and stored & KEY != key:
+                slot = (slot + 1) & mask
+                stored = table[slot]
+            if stored:
+                end = self._walk(data, start, h, stored)
+                if end is not None:
+                    yield start, end
+
+    def __contains__(self, password):
+        """Is this exact password (case-insensitive) in the list?"""
+        data = _encode(password)
+        if not self.entries or not self.min_length <= len(data) <= self.max_length:
+            return False
+        h = fingerprint(data[:self.min_length])
+        stored = self._lookup(h)
+        return bool(stored) and self._walk(data, 0, h, stored) == len(data)
+
+    def find(self, password):
+        """Longest listed substring of the password, as a (start, end) span of its characters, or None"""
+        data = _encode(password)
+        best = None
+        for start, end in self._ends(data, 0, len(data) - self.min_length):
+            if best is None or end - start > best[1] - best[0]:
+                best = (start, end)
+        if best is not None and len(data) != len(password):
+            best = _char_span(password, *best)  # Equal lengths mean one byte per character
+        return best
+
+    def has_listed_suffix(self, password):
+        """Does the password end with a listed word? Checking after each appended character covers every substring."""
+        data = _encode(password)
+        size = len(data)
+        if not self.entries:
+            return False
+        # Grow the suffix hash leftwards a byte at a time: one probe per suffix length, no walking
+        h, weight = 0, 1
+        for position in range(size - 1, max(size - self.max_length, 0) - 1, -1):
+            h = (h + CODE[data[position]] * weight) & MASK
+            weight = (weight * BASE) & MASK
+            if size - position >= self.min_length and self._lookup(h) & WORD:
+                return True
+        return False
+
+    def __len__(self):
+        return self.entries
+
+    def close(self):
+        self._table.release()
+        self._mmap.close()
+
+
+def load_default_index():
+    """The index next to this module, or None if it hasn't been built"""
+    return BreachedPasswordIndex(DEFAULT_INDEX_PATH) if DEFAULT_INDEX_PATH.exists() else None
+
+
+_default_index = None
+
+
+def default_index():
+    """The index next to this module, memory-mapped on first use and then shared; None if it hasn't been built"""
+    global _default_index
+    if _default_index is None:
+        _default_index = load_default_index() or False
+    return _default_index or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the breached-password index")
+    parser.add_argument("wordlist", help="Text file with one password per line")
+    parser.add_argument("index", nargs="?", default=str(DEFAULT_INDEX_PATH), help="Index file to write")
+    parser.add_argument("--min-length", type=int, default=MIN_WORD_LENGTH,
+                        help="Skip listed passwords shorter than this")
+    args = parser.parse_args()
+    index = BreachedPasswordIndex.build(args.wordlist, args.index, args.min_length)
+    print(f"Indexed {len(index):,} passwords ({index.slots:,} slots) into {args.index}")
+
+
+if __name__ == "__main__":
+    main()
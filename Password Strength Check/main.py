@@ -1,61 +1,343 @@
-import re
-import random
-import string
-
-def check_password_strength(password):
-    suggestions = []
-    is_strong = True
-
-    # Check length
-    if len(password) < 12:
-        suggestions.append("Password should be at least 12 characters long.")
-        is_strong = False
-
-    # Check for uppercase letters
-    if not re.search(r'[A-Z]', password):
-        suggestions.append("Add at least one uppercase letter (A-Z).")
-        is_strong = False
-
-    # Check for lowercase letters
-    if not re.search(r'[a-z]', password):
-        suggestions.append("Add at least one lowercase letter (a-z).")
-        is_strong = False
-
-    # Check for numbers
-    if not re.search(r'[0-9]', password):
-        suggestions.append("Add at least one number (0-9).")
-        is_strong = False
-
-    # Check for special characters
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        suggestions.append("Add at least one special character (e.g., !@#$%^&*).")
-        is_strong = False
-
-    # Check for common patterns (simple example)
-    common_weak_patterns = ["password", "123", "qwerty", "admin"]
-    if any(pattern in password.lower() for pattern in common_weak_patterns):
-        suggestions.append("Avoid common words or patterns.")
-        is_strong = False
-
-    return is_strong, suggestions
-
-def generate_strong_password(length=16):
-    chars = string.ascii_letters + string.digits + "!@#$%^&*(),.?\":{}|<>"
-    while True:
-        password = ''.join(random.choice(chars) for _ in range(length))
-        is_strong, _ = check_password_strength(password)
-        if is_strong:
-            return password
-
-# Example usage:
-user_password = input("Enter your password to check: ")
-is_strong, suggestions = check_password_strength(user_password)
-
-if is_strong:
-    print("✅ Your password is strong!")
-else:
-    print("❌ Your password is weak. Suggestions to improve:")
-    for suggestion in suggestions:
-        print(f"- {suggestion}")
-    new_password = generate_strong_password()
-    print(f"\n💡 Here's a stronger password suggestion: {new_password}")
+import os
+import sys
+import json
+import math
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from breach_index import default_index
+from password_policy import DEFAULT_POLICY, DIGIT, LOWER, OTHER, SPECIAL, SYMBOL, UPPER, PasswordPolicy
+
+# Alphabet size an attacker has to cover once a class shows up (SPECIAL and SYMBOL share one pool)
+POOL_SIZES = ((LOWER, 26), (UPPER, 26), (DIGIT, 10), (SPECIAL | SYMBOL, 33), (OTHER, 100))
+PREDICTABLE_BITS = 1.0  # A character that just continues a repeat/sequence/keyboard walk
+MIN_PATTERN_LENGTH = 3
+
+# US QWERTY rows, unshifted and shifted; each row sits half a key right of the one above
+KEYBOARD_ROWS = (("`1234567890-=", "~!@#$%^&*()_+"), ("qwertyuiop[]\\", "QWERTYUIOP{}|"),
+                 ("asdfghjkl;'", 'ASDFGHJKL:"'), ("zxcvbnm,./", "ZXCVBNM<>?"))
+_KEY_POSITIONS = {char: (row, col + row / 2)
+                  for row, keys in enumerate(KEYBOARD_ROWS) for layer in keys for col, char in enumerate(layer)}
+ADJACENT_KEYS = frozenset(
+    (a, b) for a, (row_a, x_a) in _KEY_POSITIONS.items() for b, (row_b, x_b) in _KEY_POSITIONS.items()
+    if (row_a == row_b and abs(x_a - x_b) == 1) or (abs(row_a - row_b) == 1 and abs(x_a - x_b) == 0.5)
+)
+
+# Entropy (bits) thresholds for scores 1-4
+SCORE_THRESHOLDS = (28, 36, 60, 80)
+
+def default_breach_index():
+    """The breached-password index next to this file, loaded (memory-mapped) on first use; None if not built"""
+    return default_index()
+
+
+def analyze_password(password, breach_index=None, policy=DEFAULT_POLICY):
+    """Classify characters, find patterns and estimate entropy in one pass over the password.
+
+    Returns a dict with the character classes present (by the policy's
+    lookup table), repeats / sequences / keyboard walks found, the longest
+    breached-list substring (if the policy checks breaches and an index is
+    available), entropy in bits and a 0-4 score.
+    """
+    char_classes = policy.char_classes
+    classes = 0
+    patterns = []
+    run_kind, run_start, run_delta = None, 0, 0
+    prev, prev_code = None, 0
+    for i, char in enumerate(password):
+        classes |= char_classes.get(char, OTHER)
+        code = ord(char)
+        kind, delta = None, code - prev_code
+        if prev is not None:
+            sequence = delta in (1, -1) and char.isalnum() and prev.isalnum()
+            if char == prev:
+                kind = "repeat"
+            elif (prev, char) in ADJACENT_KEYS and (run_kind == "keyboard" or not sequence):
+                kind = "keyboard"  # "op" in "qwertyuiop" continues the walk
+            elif sequence:
+                kind = "sequence"
+        if kind is None or kind != run_kind or (kind == "sequence" and delta != run_delta):
+            if run_kind is not None and i - run_start >= MIN_PATTERN_LENGTH:
+                patterns.append((run_kind, run_start, i))
+            run_kind, run_start, run_delta = kind, i - 1, delta
+        prev, prev_code = char, code
+    if run_kind is not None and len(password) - run_start >= MIN_PATTERN_LENGTH:
+        patterns.append((run_kind, run_start, len(password)))
+
+    breached = None
+    index = None
+    if policy.check_breached:
+        index = breach_index if breach_index is not None else default_breach_index()
+    if index is not None:
+        breached = index.find(password)
+
+    pool = sum(size for mask, size in POOL_SIZES if classes & mask)
+    bits_per_char = math.log2(pool) if pool else 0.0
+    predictable = bytearray(len(password))
+    for _, start, end in patterns:
+        predictable[start + 1:end] = b"\x01" * (end - start - 1)
+    entropy = 0.0
+    if breached is not None:
+        # Guessing a listed password costs about log2(list size) bits, not its length
+        predictable[breached[0]:breached[1]] = b"\x02" * (breached[1] - breached[0])
+        entropy += math.log2(max(len(index), 2))
+    entropy += predictable.count(0) * bits_per_char + predictable.count(1) * PREDICTABLE_BITS
+
+    return {
+        "length": len(password),
+        "classes": classes,
+        "has_lower": bool(classes & LOWER),
+        "has_upper": bool(classes & UPPER),
+        "has_digit": bool(classes & DIGIT),
+        "has_special": bool(classes & SPECIAL),
+        "patterns": [(kind, password[start:end]) for kind, start, end in patterns],
+        "breached": password[breached[0]:breached[1]] if breached else None,
+        "entropy_bits": round(entropy, 1),
+        "score": sum(entropy >= threshold for threshold in SCORE_THRESHOLDS),
+    }
+
+
+def failed_rules(password, analysis, policy=DEFAULT_POLICY):
+    """Ids of the policy rules an analyzed password breaks"""
+    return policy.failed_rules(password, analysis["classes"], analysis["breached"] is not None)
+
+
+def check_password_strength(password, breach_index=None, policy=DEFAULT_POLICY):
+    failed = failed_rules(password, analyze_password(password, breach_index, policy), policy)
+    return not failed, [policy.suggestions[rule] for rule in failed]
+
+
+class _EntropyPool:
+    """Unbiased-in-practice small random integers from one os.urandom read.
+
+    secrets.randbelow makes a system call per draw; here a big random
+    integer is read once and split by divmod (mixed-radix extraction). It
+    is refilled before fewer than 64 spare bits remain, which keeps every
+    draw's bias below 2**-64.
+    """
+
+    def __init__(self, draws):
+        self.bytes_per_fill = 8 * draws + 16
+        self.pool = 0
+
+    def below(self, n):
+        if self.pool >> 64 == 0:
+            self.pool = int.from_bytes(os.urandom(self.bytes_per_fill), "big")
+        self.pool, value = divmod(self.pool, n)
+        return value
+
+
+def generate_strong_password(length=16, breach_index=None, policy=DEFAULT_POLICY):
+    """Build a password that passes check_password_strength (for the same policy) by construction.
+
+    One character of each required class goes to a distinct random
+    position, and every character is drawn from CSPRNG output from
+    candidates that cannot complete a common weak pattern or a listed
+    breached word. Each position tries each candidate at most once, so
+    the time per password is bounded instead of depending on how many
+    random drafts a retry loop has to throw away.
+    """
+    if length < max(policy.min_length, len(policy.required)):
+        raise ValueError(f"Strong passwords need at least {policy.min_length} characters.")
+    classes = [chars for _, _, chars, _ in policy.required]
+    entropy = _EntropyPool(length + len(classes))
+    below = entropy.below
+    # Distinct random positions for the required classes (partial Fisher-Yates)
+    positions = list(range(length))
+    banned = policy.banned_characters
+    if banned:
+        classes = ["".join(char for char in chars if char.lower() not in banned) for chars in classes]
+    alphabet = "".join(char for char in policy.alphabet if char.lower() not in banned) if banned else policy.alphabet
+    slots = [alphabet] * length
+    for i, chars in enumerate(classes):
+        j = i + below(length - i)
+        positions[i], positions[j] = positions[j], positions[i]
+        slots[positions[i]] = chars
+    index = None
+    if policy.check_breached:
+        index = breach_index if breach_index is not None else default_breach_index()
+    pattern_starts = policy.pattern_starts
+
+    password = ""
+    partial = []  # (pattern, characters matched so far) for weak patterns the password currently ends in
+    for chars in slots:
+        # Leave out characters that would finish a weak pattern ("12" + "3", "admi" + "n", ...)
+        if partial:
+            excluded = {pattern[matched] for pattern, matched in partial if matched == len(pattern) - 1}
+            if excluded:
+                chars = "".join(char for char in chars if char.lower() not in excluded)
+        if not chars:
+            raise ValueError("The weak-pattern list rules out every character for this position.")
+        char = chars[below(len(chars))]
+        if index is not None and index.has_listed_suffix(password + char):
+            # Rare: try the remaining candidates in random order, each at most once
+            candidates = [other for other in chars if other != char]
+            while True:
+                if not candidates:
+                    raise ValueError("The blacklist rules out every character for this position.")
+                char = candidates.pop(below(len(candidates)))
+                if not index.has_listed_suffix(password + char):
+                    break
+        password += char
+        lower = char.lower()
+        partial = [(pattern, matched + 1) for pattern, matched in partial if pattern[matched] == lower]
+        partial += pattern_starts.get(lower, ())
+    return password
+
+
+def audit_chunk(lines, potfile=False, separator=":", include_password=False, policy=DEFAULT_POLICY):
+    """Check a chunk of (line number, line) pairs.
+
+    Returns the JSONL text for the chunk and its aggregate counters. For a
+    potfile ("hash:plaintext" lines) the hash identifies the record and
+    the plaintext is only written out when include_password is set.
+    """
+    out = []
+    totals, rules, scores, entropy, patterns = Counter(), Counter(), Counter(), Counter(), Counter()
+    for number, line in lines:
+        record = {"line": number}
+        if potfile:
+            record["hash"], _, password = line.partition(separator)
+        else:
+            password = line
+        if include_password:
+            record["password"] = password
+        analysis = analyze_password(password, policy=policy)
+        failed = failed_rules(password, analysis, policy)
+        record.update(strong=not failed, failed_rules=failed, score=analysis["score"],
+                      entropy_bits=analysis["entropy_bits"], patterns=[kind for kind, _ in analysis["patterns"]],
+                      breached=analysis["breached"] is not None)
+        out.append(json.dumps(record))
+
+        totals["total"] += 1
+        totals["weak" if failed else "strong"] += 1
+        totals["breached"] += record["breached"]
+        rules.update(failed)
+        scores[analysis["score"]] += 1
+        entropy[int(analysis["entropy_bits"] // 10 * 10)] += 1
+        patterns.update(set(record["patterns"]))
+    text = "\n".join(out) + "\n" if out else ""
+    return text, (totals, rules, scores, entropy, patterns)
+
+
+def iter_chunks(path, chunk_size):
+    """Numbered, non-empty lines of a password file, chunk_size at a time"""
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        lines = ((number, line.rstrip("\r\n")) for number, line in enumerate(f, 1))
+        lines = ((number, line) for number, line in lines if line)
+        while chunk := list(islice(lines, chunk_size)):
+            yield chunk
+
+
+def audit_file(path, output=None, workers=None, chunk_size=10000, potfile=False, separator=":",
+               include_password=False, policy=DEFAULT_POLICY):
+    """Stream a password file through the strength check and build the aggregate report.
+
+    Chunks run on a process pool with only about two chunks per worker in
+    flight, so memory stays bounded however big the file is. Per-line
+    results go to output as JSONL, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    aggregates = (Counter(), Counter(), Counter(), Counter(), Counter())
+    out = open(output, "w", encoding="utf-8") if output else None
+    chunks = iter_chunks(path, chunk_size)
+    args = (potfile, separator, include_password, policy)
+
+    def collect(result):
+        text, counters = result
+        if out is not None:
+            out.write(text)
+        for total, counter in zip(aggregates, counters):
+            total.update(counter)
+
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                collect(audit_chunk(chunk, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(audit_chunk, chunk, *args))
+                    if len(pending) >= workers * 2:
+                        collect(pending.popleft().result())
+                while pending:
+                    collect(pending.popleft().result())
+    finally:
+        if out is not None:
+            out.close()
+
+    totals, rules, scores, entropy, patterns = aggregates
+    return {
+        "total": totals["total"],
+        "strong": totals["strong"],
+        "weak": totals["weak"],
+        "breached": totals["breached"],
+        "rule_failures": {rule: rules[rule] for rule, _ in policy.rules},
+        "score_histogram": {str(score): scores[score] for score in range(len(SCORE_THRESHOLDS) + 1)},
+        "entropy_histogram": {f"{low}-{low + 9}": entropy[low] for low in sorted(entropy)},
+        "patterns": dict(patterns.most_common()),
+    }
+
+
+def print_report(report):
+    print(f"🔐 Audited {report['total']:,} passwords: {report['strong']:,} strong, {report['weak']:,} weak, "
+          f"{report['breached']:,} breached")
+    print("Rule failures:")
+    for rule, count in report["rule_failures"].items():
+        print(f"  {rule:<15} {count:>12,}")
+    print("Strength score histogram:")
+    for score, count in report["score_histogram"].items():
+        print(f"  {score}/4 {count:>12,}")
+    if report["patterns"]:
+        print("Patterns:", ", ".join(f"{kind} {count:,}" for kind, count in report["patterns"].items()))
+
+
+def interactive(policy=DEFAULT_POLICY):
+    user_password = input("Enter your password to check: ")
+    is_strong, suggestions = check_password_strength(user_password, policy=policy)
+    analysis = analyze_password(user_password, policy=policy)
+    print(f"🔢 Estimated entropy: {analysis['entropy_bits']} bits (score {analysis['score']}/4)")
+
+    if is_strong:
+        print("✅ Your password is strong!")
+    else:
+        print("❌ Your password is weak. Suggestions to improve:")
+        for suggestion in suggestions:
+            print(f"- {suggestion}")
+        new_password = generate_strong_password(max(16, policy.min_length), policy=policy)
+        print(f"\n💡 Here's a stronger password suggestion: {new_password}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password strength checker and batch auditor")
+    parser.add_argument("--audit", metavar="FILE", help="Audit a file with one password per line")
+    parser.add_argument("--policy", metavar="FILE", help="Password policy as JSON or TOML")
+    parser.add_argument("--potfile", action="store_true",
+                        help="Lines are hash<separator>plaintext; the hash identifies each result")
+    parser.add_argument("--separator", default=":", help="Hash/plaintext separator for --potfile")
+    parser.add_argument("--output", help="Write per-line results as JSONL")
+    parser.add_argument("--report", help="Write the aggregate report as JSON")
+    parser.add_argument("--include-passwords", action="store_true", help="Put plaintexts in the JSONL output")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Passwords per worker task")
+    args = parser.parse_args(argv)
+    policy = PasswordPolicy.load(args.policy) if args.policy else DEFAULT_POLICY
+
+    if args.audit is None:
+        interactive(policy)
+        return 0
+
+    report = audit_file(args.audit, args.output, args.workers, args.chunk_size, args.potfile,
+                        args.separator, args.include_passwords, policy)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
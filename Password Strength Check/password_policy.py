@@ -0,0 +1,155 @@
+"""📜 Password policy shared by the strength checker and the password generators.
+
+A PasswordPolicy is built once, from keyword arguments or a JSON/TOML file,
+and compiles its rules up front: a character -> class lookup table, the
+required classes, the generator alphabet and one regex for all weak
+patterns. Checking a password is then one pass over its characters plus
+one regex search, and nothing is recompiled per call.
+
+    min_length = 12
+    require_uppercase = true
+    require_lowercase = true
+    require_digit = true
+    require_special = true
+    special_characters = "!@#$%^&*(),.?\":{}|<>"
+    weak_patterns = ["password", "123", "qwerty", "admin"]
+    check_breached = true
+"""
+import re
+import json
+import string
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON policies only
+    tomllib = None
+
+# Character class bits
+LOWER, UPPER, DIGIT, SPECIAL, SYMBOL, OTHER = 1, 2, 4, 8, 16, 32
+
+DEFAULT_SPECIAL_CHARACTERS = "!@#$%^&*(),.?\":{}|<>"
+DEFAULT_WEAK_PATTERNS = ("password", "123", "qwerty", "admin")
+
+
+class PasswordPolicy:
+    """🧾 Compiled password rules: length, required character classes and weak patterns"""
+
+    FIELDS = ("min_length", "require_uppercase", "require_lowercase", "require_digit", "require_special",
+              "special_characters", "weak_patterns", "check_breached")
+
+    def __init__(self, min_length=12, require_uppercase=True, require_lowercase=True, require_digit=True,
+                 require_special=True, special_characters=DEFAULT_SPECIAL_CHARACTERS,
+                 weak_patterns=DEFAULT_WEAK_PATTERNS, check_breached=True):
+        if require_special and not special_characters:
+            raise ValueError("require_special needs at least one special character.")
+        self.min_length = min_length
+        self.require_uppercase = require_uppercase
+        self.require_lowercase = require_lowercase
+        self.require_digit = require_digit
+        self.require_special = require_special
+        self.special_characters = special_characters
+        self.weak_patterns = tuple(pattern.lower() for pattern in weak_patterns if pattern)
+        self.check_breached = check_breached
+        self._compile()
+
+    def _compile(self):
+        special = self.special_characters
+        # Lookup table: every character's class, with the policy's special set on top of other symbols
+        self.char_classes = {}
+        for chars, char_class in ((string.ascii_lowercase, LOWER), (string.ascii_uppercase, UPPER),
+                                  (string.digits, DIGIT), (string.punctuation + " ", SYMBOL), (special, SPECIAL)):
+            self.char_classes.update(dict.fromkeys(chars, char_class))
+
+        # (rule id, class bit, characters, suggestion) for each required class, in reporting order
+        classes = (
+            ("uppercase", self.require_uppercase, UPPER, string.ascii_uppercase,
+             "Add at least one uppercase letter (A-Z)."),
+            ("lowercase", self.require_lowercase, LOWER, string.ascii_lowercase,
+             "Add at least one lowercase letter (a-z)."),
+            ("digit", self.require_digit, DIGIT, string.digits, "Add at least one number (0-9)."),
+            ("special", self.require_special, SPECIAL, special,
+             f"Add at least one special character (e.g., {special[:8]})."),
+        )
+        self.required = [(rule, mask, chars, suggestion) for rule, on, mask, chars, suggestion in classes if on]
+        self.alphabet = string.ascii_letters + string.digits + special
+
+        self.rules = [("min_length", f"Password should be at least {self.min_length} characters long.")]
+        self.rules += [(rule, suggestion) for rule, _, _, suggestion in self.required]
+        self.rules.append(("common_pattern", "Avoid common words or patterns."))
+        self.suggestions = dict(self.rules)
+
+        # One alternation for every weak pattern, longest first
+        patterns = sorted(set(self.weak_patterns), key=len, reverse=True)
+        self.weak_pattern_re = re.compile("|".join(map(re.escape, patterns))) if patterns else None
+        # One-character patterns just ban that character; generators leave it out up front
+        self.banned_characters = frozenset(pattern for pattern in self.weak_patterns if len(pattern) == 1)
+        for rule, _, chars, _ in self.required:
+            if all(char.lower() in self.banned_characters for char in chars):
+                raise ValueError(f"Weak patterns rule out every character the {rule} rule requires.")
+        # First character -> [(pattern, 1)] for longer patterns, for generators that avoid them as they build
+        self.pattern_starts = {}
+        for pattern in self.weak_patterns:
+            if len(pattern) > 1:
+                self.pattern_starts.setdefault(pattern[0], []).append((pattern, 1))
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = set(data) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown password policy settings: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path):
+        """📂 Load a policy from a .json or .toml file"""
+        path = Path(path)
+        if path.suffix.lower() == ".toml":
+            if tomllib is None:
+                raise RuntimeError("TOML policies need Python 3.11+ (tomllib); use JSON instead")
+            with open(path, "rb") as f:
+                return cls.from_dict(tomllib.load(f))
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data["weak_patterns"] = list(self.weak_patterns)
+        return data
+
+    def classes_of(self, password):
+        """Bitmask of the character classes present in a password"""
+        get = self.char_classes.get
+        classes = 0
+        for char in set(password):
+            classes |= get(char, OTHER)
+        return classes
+
+    def weak_pattern(self, password):
+        """The first weak pattern found in the password (case-insensitive), or None"""
+        if self.weak_pattern_re is None:
+            return None
+        match = self.weak_pattern_re.search(password.lower())
+        return match.group() if match else None
+
+    def failed_rules(self, password, classes=None, breached=False):
+        """Ids of the rules a password breaks; pass classes if they are already known"""
+        if classes is None:
+            classes = self.classes_of(password)
+        failed = []
+        if len(password) < self.min_length:
+            failed.append("min_length")
+        for rule, mask, _, _ in self.required:
+            if not classes & mask:
+                failed.append(rule)
+        if breached or self.weak_pattern(password):
+            failed.append("common_pattern")
+        return failed
+
+    def validate(self, password):
+        """(is_valid, suggestions) for the policy rules alone, without a breached-password lookup"""
+        failed = self.failed_rules(password)
+        return not failed, [self.suggestions[rule] for rule in failed]
+
+
+DEFAULT_POLICY = PasswordPolicy()
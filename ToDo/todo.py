@@ -1,8 +1,11 @@
 import json
 import os
+import sqlite3
+import argparse
 
 USERS_FILE = "users.json"
 TODO_FILE = "todos.json"
+DB_FILE = "todo.db"
 
 # Load or create JSON files
 def load_data(file):
@@ -16,24 +19,153 @@ def save_data(file, data):
     with open(file, 'w') as f:
         json.dump(data, f, indent=4)
 
+# Storage backends
+# Both expose the same methods. Tasks are returned as (task_id, task) pairs
+# in the order they were added; a task_id is only meaningful to the backend
+# that returned it.
+class JSONStorage:
+    """Original format: users.json and todos.json, rewritten on every change."""
+
+    def __init__(self, users_file=USERS_FILE, todo_file=TODO_FILE):
+        self.users_file = users_file
+        self.todo_file = todo_file
+
+    def get_password(self, username):
+        return load_data(self.users_file).get(username)
+
+    def add_user(self, username, password):
+        users = load_data(self.users_file)
+        if username in users:
+            return False
+        users[username] = password
+        save_data(self.users_file, users)
+        return True
+
+    def list_tasks(self, username):
+        return list(enumerate(load_data(self.todo_file).get(username, [])))
+
+    def add_task(self, username, task):
+        todos = load_data(self.todo_file)
+        todos.setdefault(username, []).append(task)
+        save_data(self.todo_file, todos)
+
+    def remove_task(self, username, task_id):
+        todos = load_data(self.todo_file)
+        tasks = todos.get(username, [])
+        if not 0 <= task_id < len(tasks):
+            return None
+        removed = tasks.pop(task_id)
+        save_data(self.todo_file, todos)
+        return removed
+
+    def close(self):
+        pass
+
+class SQLiteStorage:
+    """SQLite store with tasks indexed by (username, id).
+
+    Adding or removing a task touches one row and its index entry, so it
+    costs O(log n) however many users and tasks share the database, and
+    listing reads only that user's tasks.
+    """
+
+    def __init__(self, db_path=DB_FILE):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                password TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                username TEXT NOT NULL,
+                task TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_username ON tasks (username, id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            ) WITHOUT ROWID;
+        """)
+
+    def get_password(self, username):
+        row = self.conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, username, password):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", (username, password))
+        return cursor.rowcount == 1
+
+    def list_tasks(self, username):
+        return self.conn.execute(
+            "SELECT id, task FROM tasks WHERE username = ? ORDER BY id", (username,)).fetchall()
+
+    def add_task(self, username, task):
+        with self.conn:
+            self.conn.execute("INSERT INTO tasks (username, task) VALUES (?, ?)", (username, task))
+
+    def remove_task(self, username, task_id):
+        with self.conn:
+            # Take the write lock before reading, so the task returned is the one deleted
+            # (DELETE ... RETURNING would need SQLite 3.35+)
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                "SELECT task FROM tasks WHERE id = ? AND username = ?", (task_id, username)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return row[0] if row else None
+
+    def migrated_from_json(self):
+        return self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_migration'").fetchone() is not None
+
+    def migrate_json(self, users_file=USERS_FILE, todo_file=TODO_FILE):
+        """One-shot import of users.json and todos.json; returns (users, tasks, skipped).
+
+        users and tasks count the rows imported. skipped lists usernames the
+        database already has: they are someone else's account here, so
+        neither the JSON user nor their tasks are imported. Runs in a single
+        transaction and is recorded in the meta table, so running it again
+        does nothing.
+        """
+        if self.migrated_from_json():
+            return 0, 0, []
+        users = load_data(users_file) if os.path.exists(users_file) else {}
+        todos = load_data(todo_file) if os.path.exists(todo_file) else {}
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # Nobody can sign up between the check and the import
+            skipped = {username for username in users.keys() | todos.keys() if self.get_password(username) is not None}
+            users = [(username, password) for username, password in users.items() if username not in skipped]
+            rows = [(username, task) for username, tasks in todos.items() if username not in skipped
+                    for task in tasks]
+            imported_users = self.conn.executemany(
+                "INSERT INTO users (username, password) VALUES (?, ?)", users).rowcount
+            imported_tasks = self.conn.executemany("INSERT INTO tasks (username, task) VALUES (?, ?)", rows).rowcount
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_migration', datetime('now'))")
+        return imported_users, imported_tasks, sorted(skipped)
+
+    def close(self):
+        self.conn.close()
+
 # Auth Functions
-def signup():
-    users = load_data(USERS_FILE)
+def signup(storage):
     username = input("Enter new username: ")
-    if username in users:
+    if storage.get_password(username) is not None:
         print("Username already exists.")
         return None
     password = input("Enter new password: ")
-    users[username] = password
-    save_data(USERS_FILE, users)
+    if not storage.add_user(username, password):
+        print("Username already exists.")
+        return None
     print("Signup successful.")
     return username
 
-def login():
-    users = load_data(USERS_FILE)
+def login(storage):
     username = input("Enter username: ")
     password = input("Enter password: ")
-    if users.get(username) == password:
+    if storage.get_password(username) == password:
         print("Login successful.")
         return username
     else:
@@ -41,40 +173,74 @@ def login():
         return None
 
 # Todo Functions
-def add_task(username):
-    todos = load_data(TODO_FILE)
+def add_task(storage, username):
     task = input("Enter a task: ")
-    todos.setdefault(username, []).append(task)
-    save_data(TODO_FILE, todos)
+    storage.add_task(username, task)
     print("Task added.")
 
-def view_tasks(username):
-    todos = load_data(TODO_FILE)
-    user_tasks = todos.get(username, [])
+def view_tasks(storage, username):
+    user_tasks = storage.list_tasks(username)
     if not user_tasks:
         print("No tasks.")
     else:
-        for i, task in enumerate(user_tasks, 1):
+        for i, (_, task) in enumerate(user_tasks, 1):
             print(f"{i}. {task}")
+    return user_tasks
 
-def remove_task(username):
-    todos = load_data(TODO_FILE)
-    tasks = todos.get(username, [])
-    view_tasks(username)
+def remove_task(storage, username):
+    tasks = view_tasks(storage, username)
     try:
         task_num = int(input("Enter task number to remove: "))
         if 1 <= task_num <= len(tasks):
-            removed = tasks.pop(task_num - 1)
-            todos[username] = tasks
-            save_data(TODO_FILE, todos)
+            # Map the number shown back to the backend's task id
+            removed = storage.remove_task(username, tasks[task_num - 1][0])
             print(f"Removed: {removed}")
         else:
             print("Invalid number.")
     except ValueError:
         print("Enter a valid number.")
 
+def open_storage(backend="sqlite", db_path=DB_FILE):
+    """Open the chosen backend; a new SQLite store imports existing JSON files once."""
+    if backend == "json":
+        return JSONStorage()
+    storage = SQLiteStorage(db_path)
+    if not storage.migrated_from_json() and (os.path.exists(USERS_FILE) or os.path.exists(TODO_FILE)):
+        users, tasks, skipped = storage.migrate_json()
+        print(f"Imported {users} users and {tasks} tasks from {USERS_FILE}/{TODO_FILE} into {db_path}.")
+        if skipped:
+            print(f"Skipped users already in {db_path}, and their tasks: {', '.join(skipped)}")
+    return storage
+
 # Main CLI Loop
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI To-Do App with Auth")
+    parser.add_argument("--storage", choices=("sqlite", "json"), default="sqlite",
+                        help="Storage backend (json keeps the original users.json/todos.json files)")
+    parser.add_argument("--db", default=DB_FILE, help="SQLite database file")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Import users.json/todos.json into the SQLite database and exit")
+    args = parser.parse_args(argv)
+
+    if args.migrate:
+        storage = SQLiteStorage(args.db)
+        if storage.migrated_from_json():
+            print(f"{args.db} has already been migrated.")
+        else:
+            users, tasks, skipped = storage.migrate_json()
+            print(f"Imported {users} users and {tasks} tasks into {args.db}.")
+            if skipped:
+                print(f"Skipped users already in {args.db}, and their tasks: {', '.join(skipped)}")
+        storage.close()
+        return
+
+    storage = open_storage(args.storage, args.db)
+    try:
+        run(storage)
+    finally:
+        storage.close()
+
+def run(storage):
     while True:
         print("Welcome to CLI To-Do App with Auth")
         current_user = None
@@ -82,9 +248,9 @@ def main():
         while not current_user:
             choice = input("\n1. Signup\n2. Login\n3. Exit\nChoose an option: ")
             if choice == '1':
-                current_user = signup()
+                current_user = signup(storage)
             elif choice == '2':
-                current_user = login()
+                current_user = login(storage)
             elif choice == '3':
                 print("Goodbye!")
                 return
@@ -102,11 +268,11 @@ def main():
             option = input("Choose an option: ")
 
             if option == '1':
-                add_task(current_user)
+                add_task(storage, current_user)
             elif option == '2':
-                view_tasks(current_user)
+                view_tasks(storage, current_user)
             elif option == '3':
-                remove_task(current_user)
+                remove_task(storage, current_user)
             elif option == '4':
                 current_user = None
                 print("Logged out.")